@@ -0,0 +1,371 @@
+"""Headless benchmark for every page of app.py.
+
+Each scale runs in a fresh process against its own database holding N
+campaigns and N investments, with Gemini replaced by bench/gemini_stub.py
+(injected latency; each model's first call is a 429). Per scale it reports:
+
+- rerun latency per page: first run of a new session, then p50/p95 of reruns
+- memory per session: Python heap held by one extra session on each page (after a warm-up)
+- AI actions through the stub: Quick Wins and the streamed roadmap
+- vouch / invest clicks through AppTest, and raw repository throughput
+
+    python bench/bench_app.py --scales 10,1000,100000 --out bench/baseline.json
+    python bench/bench_app.py --compare bench/baseline.json   # exit 1 on a regression
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+APP = os.path.join(ROOT, "app.py")
+PAGES = ["Home", "AI Assistant", "Fundraising", "Investor Portal", "Adaptive Tracker"]
+USER = "sarah"              # app.CURRENT_USER
+WORDS = ["organic", "handmade", "bakery", "spices", "wooden", "toys", "coffee", "vegan",
+         "candles", "ceramics", "bikes", "tailor", "honey", "tea", "soap", "florist"]
+
+# Metrics where bigger is better; everything else is a latency or a size
+HIGHER_IS_BETTER = ("per_s",)
+# Counts, and single samples too noisy to gate on (a page's first run is one cold measurement)
+NOT_COMPARED = ("stub_requests", "stub_429s", "invests", "roadmap_weeks", "first_ms", "populate_s")
+THROUGHPUT_ROUNDS = 3  # throughput is the best of this many runs
+# Latencies this close to the baseline are scheduler noise, whatever the percentage
+NOISE_FLOOR_MS = 25
+
+
+# --- DATA ---
+def populate(path, n, seed=0):
+    """Bulk-load n campaigns and n investments for USER (bypasses the ledger on purpose)."""
+    from storage import SQLiteRepository
+    SQLiteRepository(path).list_campaigns_page(limit=1)   # schema + demo seeds
+    rng = random.Random(seed)
+    now = time.time()
+    conn = sqlite3.connect(path)
+    with conn:
+        version = conn.execute("SELECT value FROM meta WHERE key = 'catalogue_version'").fetchone()[0] + 1
+        conn.executemany(
+            "INSERT INTO campaigns (name, owner, description, points, goal, image, community_vouches,"
+            " monthly_revenue, months_in_business, changed_seq, created_at)"
+            " VALUES (?, ?, ?, ?, 1000, NULL, ?, ?, ?, ?, ?)",
+            (
+                (f"Bench Shop {i}", f"owner{i % 997}", " ".join(rng.sample(WORDS, 4)),
+                 rng.randrange(0, 1600), rng.randrange(0, 120), rng.randrange(200, 20000),
+                 rng.randrange(1, 60), version, now)
+                for i in range(n)
+            ),
+        )
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'catalogue_version'", (version,))
+        max_id = conn.execute("SELECT MAX(id) FROM campaigns").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO investments (campaign_id, user_id, business, amount, date, status, created_at)"
+            " VALUES (?, ?, ?, ?, ?, 'Active', ?)",
+            (
+                (cid, USER, f"Bench Shop {cid}", rng.randrange(100, 2000),
+                 f"{2024 + m // 12}-{m % 12 + 1:02d}-{rng.randrange(1, 28):02d}", now)
+                for cid, m in ((rng.randrange(1, max_id + 1), rng.randrange(0, 24)) for _ in range(n))
+            ),
+        )
+    conn.close()
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)] if ordered else None
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+# --- PAGES ---
+def _session(page, **state):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=900)
+    at.session_state["page"] = page
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at
+
+
+def _run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{at.session_state['page']}: {at.exception[0].value}")
+    return elapsed
+
+
+def bench_pages(reruns):
+    results = {}
+    for page in PAGES:
+        at = _session(page)
+        first = _run(at)
+        # As timeit does: a full collection over a 100k-row heap would land on one random rerun
+        gc.collect()
+        gc.disable()
+        try:
+            times = [_run(at) for _ in range(reruns)]
+        finally:
+            gc.enable()
+        results[page] = {"first_ms": _ms(first), "p50_ms": _ms(_percentile(times, 50)),
+                         "p95_ms": _ms(_percentile(times, 95))}
+    return results
+
+
+def bench_memory():
+    """Heap held by one more session on each page, measured after a warm-up session filled the caches."""
+    results = {}
+    tracemalloc.start()
+    try:
+        for page in PAGES:
+            _run(_session(page))    # warm-up: process-wide caches and imports aren't per-session cost
+            gc.collect()
+            before = tracemalloc.take_snapshot()
+            at = _session(page)
+            _run(at)
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+            held = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+            results[page] = round(held / 1024, 1)
+            del at
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def bench_ai(stub_config):
+    at = _session("AI Assistant", api_key="bench")
+    _run(at)
+    start = time.perf_counter()
+    next(b for b in at.button if "Quick Wins" in b.label).click()
+    _run(at)
+    quick = time.perf_counter() - start
+
+    # A goal nobody asked for before, so the response cache can't answer it
+    next(t for t in at.text_input if "Main Goal" in t.label).input(f"Bench goal {uuid.uuid4().hex[:8]}")
+    _run(at)
+    start = time.perf_counter()
+    next(b for b in at.button if "Roadmap" in b.label).click()
+    _run(at)
+    roadmap = time.perf_counter() - start
+    return {
+        "quick_wins_ms": _ms(quick),
+        "roadmap_ms": _ms(roadmap),
+        "roadmap_weeks": len(at.session_state["generated_roadmap"]) if "generated_roadmap" in at.session_state else 0,
+        "stub_requests": stub_config.requests,
+        "stub_429s": stub_config.throttled,
+    }
+
+
+def bench_clicks(repo, clicks):
+    repo.change_pool(USER, 10_000_000, idempotency_key=uuid.uuid4().hex)
+    at = _session("Fundraising")
+    _run(at)
+    vouch_times = []
+    for _ in range(clicks):
+        buttons = [b for b in at.button if b.key and b.key.startswith("vouch_")]
+        if not buttons:
+            break
+        start = time.perf_counter()
+        buttons[0].click()
+        _run(at)
+        vouch_times.append(time.perf_counter() - start)
+
+    at = _session("Investor Portal")
+    _run(at)
+    invest_times = []
+    for _ in range(clicks):
+        buttons = [b for b in at.button if b.key and b.key.startswith("invest_btn_")]
+        if not buttons:
+            break
+        start = time.perf_counter()
+        buttons[0].click()
+        _run(at)
+        invest_times.append(time.perf_counter() - start)
+    return {
+        "vouch_click_p50_ms": _ms(_percentile(vouch_times, 50) or 0),
+        "invest_click_p50_ms": _ms(_percentile(invest_times, 50) or 0),
+    }
+
+
+def bench_throughput(repo, ops, threads, rounds=THROUGHPUT_ROUNDS):
+    """Raw repository actions per second from a thread pool (what each click ends up doing).
+
+    Each rate is the best of `rounds` runs: on a busy box the slower runs measure the box.
+    """
+    from storage import INVESTOR_MIN_POINTS
+    campaign_ids = [c.id for c in repo.list_campaigns_page(limit=500)]
+    investor = "bench-investor"
+    repo.change_pool(investor, 10_000_000, idempotency_key=uuid.uuid4().hex)
+    vouch_rate = invest_rate = 0.0
+    invested = 0
+
+    for r in range(rounds):
+        counts = [0] * threads
+
+        def vouches(t):
+            for n in range(ops // threads):
+                # STARTING_POINTS only covers 12 vouches, so rotate through fresh wallets
+                user = f"bench-{r}-{t}-{n // 12}"
+                counts[t] += repo.vouch(user, campaign_ids[n % len(campaign_ids)], 10, idempotency_key=uuid.uuid4().hex)
+
+        start = time.perf_counter()
+        pool = [threading.Thread(target=vouches, args=(t,)) for t in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        vouch_rate = max(vouch_rate, sum(counts) / (time.perf_counter() - start))
+
+        # Campaigns of its own, so every scale times the same number of invests
+        unfunded = [repo.create_campaign(name=f"Bench Invest {r}-{n}", owner="bench", desc="", goal=1000,
+                                         points=INVESTOR_MIN_POINTS) for n in range(ops)]
+        start = time.perf_counter()
+        done = sum(repo.invest(investor, cid, 100, idempotency_key=uuid.uuid4().hex) for cid in unfunded)
+        invest_rate = max(invest_rate, done / max(time.perf_counter() - start, 1e-9))
+        invested += done
+    return {"vouch_per_s": round(vouch_rate, 1), "invest_per_s": round(invest_rate, 1), "invests": invested}
+
+
+# --- ONE SCALE (runs in its own process) ---
+def run_scale(n, args):
+    workdir = tempfile.mkdtemp(prefix=f"groflow-bench-{n}-")
+    import gemini_stub
+    _, stub_config, base_url = gemini_stub.start(latency=args.latency, jitter=args.latency / 3,
+                                                 rate_429=args.rate_429, retry_after=0.1)
+    # Everything the app reads from the environment is decided before it's imported
+    os.environ.update({
+        "GROFLOW_DB": os.path.join(workdir, "groflow.db"),
+        "GROFLOW_REVENUE_DIR": os.path.join(workdir, "revenue"),
+        "GROFLOW_IMAGE_DIR": os.path.join(workdir, "media"),
+        "GROFLOW_PLAN_DIR": os.path.join(workdir, "plans"),
+        "GROFLOW_EVENT_LOG": os.path.join(workdir, "events.log"),
+        "GEMINI_BASE_URL": base_url,
+    })
+    import logging
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    start = time.perf_counter()
+    populate(os.environ["GROFLOW_DB"], n)
+    load_s = time.perf_counter() - start
+
+    from storage import SQLiteRepository
+    repo = SQLiteRepository(os.environ["GROFLOW_DB"])
+    result = {"populate_s": round(load_s, 2)}
+    try:
+        result["pages"] = bench_pages(args.reruns)
+        result["session_memory_kb"] = bench_memory()
+        result["ai"] = bench_ai(stub_config)
+        result["actions"] = dict(bench_clicks(repo, args.clicks), **bench_throughput(repo, args.ops, args.threads))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+# --- BASELINE COMPARISON ---
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def compare(current, baseline, tolerance):
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)."""
+    old = dict(_flatten(baseline.get("scales", {})))
+    regressions = []
+    for name, value in _flatten(current.get("scales", {})):
+        if name not in old or not old[name] or name.endswith(NOT_COMPARED):
+            continue
+        if name.endswith("_ms") and value - old[name] < NOISE_FLOOR_MS:
+            continue
+        change = (value - old[name]) / old[name]
+        if name.endswith(HIGHER_IS_BETTER):
+            change = -change
+        if change > tolerance:
+            regressions.append((name, old[name], value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless page benchmark for app.py.")
+    parser.add_argument("--scales", default="10,1000,100000", help="campaigns/investments per run")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--clicks", type=int, default=5, help="vouch/invest clicks through AppTest")
+    parser.add_argument("--ops", type=int, default=500, help="repository vouches for the throughput test")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub Gemini latency (seconds)")
+    parser.add_argument("--rate-429", type=float, default=0.0,
+                        help="share of stub requests answered with 429, on top of each model's first")
+    parser.add_argument("--out", help="write results as JSON (e.g. bench/baseline.json)")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing")
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)  # internal: run one scale
+    args = parser.parse_args()
+
+    if args.scale is not None:
+        print(json.dumps(run_scale(args.scale, args)))
+        return
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "date": time.strftime("%Y-%m-%d %H:%M:%S"), "latency": args.latency, "rate_429": args.rate_429},
+        "scales": {},
+    }
+    passthrough = [f"--reruns={args.reruns}", f"--clicks={args.clicks}", f"--ops={args.ops}",
+                   f"--threads={args.threads}", f"--latency={args.latency}", f"--rate-429={args.rate_429}"]
+    for n in (int(s) for s in args.scales.split(",")):
+        print(f"== {n:,} campaigns / investments ==", file=sys.stderr)
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), f"--scale={n}", *passthrough],
+                             capture_output=True, text=True, cwd=ROOT)
+        if out.returncode:
+            print(out.stderr, file=sys.stderr)
+            sys.exit(out.returncode)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        report["scales"][str(n)] = result
+        for page, timing in result["pages"].items():
+            print(f"  {page:<17} first {timing['first_ms']:>9.1f} ms   p50 {timing['p50_ms']:>8.1f} ms   "
+                  f"p95 {timing['p95_ms']:>8.1f} ms   {result['session_memory_kb'][page]:>9.1f} KiB/session",
+                  file=sys.stderr)
+        print(f"  AI: quick wins {result['ai']['quick_wins_ms']:.0f} ms, roadmap {result['ai']['roadmap_ms']:.0f} ms "
+              f"({result['ai']['stub_429s']} of {result['ai']['stub_requests']} stub calls were 429s)", file=sys.stderr)
+        actions = result["actions"]
+        print(f"  vouch {actions['vouch_per_s']:.0f}/s, invest {actions['invest_per_s']:.0f}/s; "
+              f"clicks p50 vouch {actions['vouch_click_p50_ms']:.0f} ms, invest {actions['invest_click_p50_ms']:.0f} ms",
+              file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old} -> {new} ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"OK: no metric regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
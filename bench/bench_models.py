@@ -0,0 +1,101 @@
+"""Memory and field-access cost of Campaign/Investment objects vs. the plain dicts they replaced.
+
+    python bench/bench_models.py --campaigns 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Campaign, Investment
+from storage import CAMPAIGN_COLUMNS, SCHEMA
+
+WORDS = ["organic", "handmade", "bakery", "spices", "wooden", "toys", "coffee", "vegan", "candles",
+         "ceramics", "bikes", "tailor", "honey", "tea", "soap", "florist", "jewelry", "prints"]
+
+
+def load(n, seed=0):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO campaigns (name, owner, description, points, goal, community_vouches,"
+        " monthly_revenue, months_in_business, created_at) VALUES (?, ?, ?, ?, 1000, ?, ?, ?, 0)",
+        ((f"Bench Shop {i}", f"owner{i % 997}", " ".join(rng.sample(WORDS, 4)), rng.randrange(0, 1600),
+          rng.randrange(0, 120), rng.randrange(200, 20000), rng.randrange(1, 60)) for i in range(n)),
+    )
+    conn.executemany(
+        "INSERT INTO investments (campaign_id, user_id, business, amount, date, created_at)"
+        " VALUES (?, 'bench', ?, ?, ?, 0)",
+        ((i + 1, f"Bench Shop {i}", rng.randrange(100, 2000),
+          f"{2024 + i % 2}-{i % 12 + 1:02d}-{rng.randrange(1, 28):02d}") for i in range(n)),
+    )
+    return conn
+
+
+def old_campaign(row):
+    # What storage used to hand out: a dict per row, plus the index's "progress" key
+    camp = dict(row)
+    camp["funded_by_investors"] = bool(camp["funded_by_investors"])
+    camp["progress"] = min(camp["points"] / camp["goal"], 1.0) if camp.get("goal") else 1.0
+    return camp
+
+
+def measure(conn, sql, build):
+    """(MiB held by the built objects, seconds to build them), strings included."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = [build(row) for row in conn.execute(sql)]
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, size / 2**20, elapsed
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark models.Campaign/Investment against dicts.")
+    parser.add_argument("--campaigns", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.campaigns
+    conn = load(n)
+
+    campaigns_sql = f"SELECT {CAMPAIGN_COLUMNS} FROM campaigns ORDER BY id"
+    investments_sql = "SELECT id, campaign_id, business, amount, date, status FROM investments ORDER BY id"
+    dicts, dict_mib, dict_s = measure(conn, campaigns_sql, old_campaign)
+    objects, obj_mib, obj_s = measure(conn, campaigns_sql, Campaign.from_row)
+    inv_dicts, inv_dict_mib, _ = measure(conn, investments_sql, dict)
+    investments, inv_mib, _ = measure(conn, investments_sql, Investment.from_row)
+
+    # What the investor cards read for every business on every rerun
+    fields = ("community_vouches", "monthly_revenue", "months_in_business", "investor_funding")
+    dict_read = timed(lambda: [[camp.get(f, 0) for f in fields] for camp in dicts])
+    obj_read = timed(lambda: [[getattr(camp, f) for f in fields] for camp in objects])
+    attr_read = timed(lambda: [(c.community_vouches, c.monthly_revenue, c.months_in_business, c.investor_funding)
+                               for c in objects])
+
+    print(f"{n:,} campaigns: dicts {dict_mib:.1f} MiB ({dict_s * 1000:.0f} ms), "
+          f"Campaign {obj_mib:.1f} MiB ({obj_s * 1000:.0f} ms) -> {dict_mib / obj_mib:.1f}x smaller")
+    print(f"  per object without strings: dict {sys.getsizeof(dicts[0])} B, Campaign {sys.getsizeof(objects[0])} B")
+    print(f"{n:,} investments: dicts {inv_dict_mib:.1f} MiB, Investment {inv_mib:.1f} MiB "
+          f"-> {inv_dict_mib / inv_mib:.1f}x smaller")
+    print(f"reading 4 fields of every campaign: .get(f, 0) {dict_read * 1000:.0f} ms, "
+          f"getattr {obj_read * 1000:.0f} ms, attributes {attr_read * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
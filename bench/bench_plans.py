@@ -0,0 +1,63 @@
+"""Plan similarity index at scale: bulk load, cold open and query latency.
+
+    python bench/bench_plans.py --plans 300000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plan_index import PlanIndex
+
+WORDS = ["organic", "handmade", "bakery", "spices", "wooden", "toys", "coffee", "vegan", "candles",
+         "ceramics", "bikes", "tailor", "honey", "tea", "soap", "florist", "jewelry", "prints"]
+GOALS = ["launch", "summer", "collection", "weekday", "orders", "instagram", "followers", "wholesale",
+         "market", "stall", "newsletter", "subscribers", "reviews", "repeat", "customers"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark plan_index.PlanIndex.")
+    parser.add_argument("--plans", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    phases = [{"phase": f"Week {w}: Plan", "tasks": ["Post twice", "Email the list"]} for w in range(1, 5)]
+    data_dir = tempfile.mkdtemp(prefix="groflow-plans-")
+    try:
+        start = time.perf_counter()
+        PlanIndex(data_dir).append([
+            (" ".join(rng.sample(WORDS, 2)), " ".join(rng.sample(GOALS, 3)),
+             rng.choice([4, 6, 8, 12]), rng.randrange(0, 10_000), phases)
+            for _ in range(args.plans)
+        ])
+        loaded = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir))
+
+        index = PlanIndex(data_dir)
+        start = time.perf_counter()
+        len(index)
+        opened = time.perf_counter() - start
+
+        times, hits = [], 0
+        for _ in range(args.queries):
+            query = (" ".join(rng.sample(WORDS, 2)), " ".join(rng.sample(GOALS, 3)), 4, rng.randrange(0, 10_000))
+            start = time.perf_counter()
+            hits += bool(index.nearest(*query))
+            times.append(time.perf_counter() - start)
+        times.sort()
+        print(f"{args.plans:,} plans: stored in {loaded:.1f} s ({size / 2**20:.0f} MiB on disk), "
+              f"opened in {opened * 1000:.0f} ms")
+        print(f"nearest(): p50 {times[len(times) // 2] * 1000:.1f} ms, "
+              f"p95 {times[int(len(times) * 0.95)] * 1000:.1f} ms, {hits}/{args.queries} found a close plan")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
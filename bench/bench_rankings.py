@@ -0,0 +1,69 @@
+"""Trending leaderboards at scale: cost per vouch/like and per page read vs. sorting everything.
+
+    python bench/bench_rankings.py --campaigns 100000 --events 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Campaign
+from rankings import Rankings
+
+PAGE = 12
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rankings.Rankings.")
+    parser.add_argument("--campaigns", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--reads", type=int, default=200, help="first-page reads, one after each event")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    campaigns = [Campaign(name=f"Bench Shop {i}", owner="bench", goal=1000, points=rng.randrange(0, 1600),
+                          monthly_revenue=rng.randrange(200, 20000), id=i)
+                 for i in range(1, args.campaigns + 1)]
+    rankings = Rankings()
+    start = time.perf_counter()
+    for camp in campaigns:
+        rankings.update(camp)
+    built = time.perf_counter() - start
+
+    # Skewed activity, like a real feed: a few campaigns get most of the vouches and likes
+    now = time.time() - args.events
+    events = [{"t": now + n, "k": rng.choice(("vouch", "like", "like")),
+               "c": min(int(rng.paretovariate(1.2)), args.campaigns)} for n in range(args.events)]
+    start = time.perf_counter()
+    for event in events:
+        rankings.observe(event)
+    observed = time.perf_counter() - start
+
+    def first_page():
+        ids = rankings.ordered("trending")
+        return [next(ids) for _ in range(PAGE)]
+
+    incremental, full = [], []
+    for n in range(args.reads):
+        rankings.observe({"t": now + args.events + n, "k": "like", "c": rng.randrange(1, args.campaigns + 1)})
+        start = time.perf_counter()
+        page = first_page()
+        incremental.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = sorted(rankings._quality, key=lambda i: (rankings.key("trending", i), i), reverse=True)[:PAGE]
+        full.append(time.perf_counter() - start)
+        assert page == expected, "leaderboard disagrees with a full sort"
+
+    incremental.sort()
+    full.sort()
+    print(f"{args.campaigns:,} campaigns indexed in {built * 1000:.0f} ms; "
+          f"{args.events:,} events at {observed / args.events * 1e6:.1f} µs each")
+    print(f"first trending page after each event: leaderboard p50 {incremental[len(incremental) // 2] * 1000:.3f} ms, "
+          f"full sort p50 {full[len(full) // 2] * 1000:.0f} ms (same {PAGE} ids every time)")
+
+
+if __name__ == "__main__":
+    main()
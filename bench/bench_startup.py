@@ -0,0 +1,138 @@
+"""Cold-start and per-rerun import budget for each page of app.py.
+
+Every page is opened in a fresh process (nothing imported, nothing cached),
+so the first run pays for the imports that page drags in. Then it is rerun
+a few times to check that reruns import nothing new. Exits 1 when:
+
+- a page loads a heavy library it has no use for (pandas on Home, say)
+- any rerun imports a module
+- a cold start takes longer than its budget
+
+    python bench/bench_startup.py
+    python bench/bench_startup.py --budget-scale 2   # slower machine / CI
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+# Libraries worth tracking: each costs 50-400 ms to import cold. numpy and
+# PIL aren't listed because st.image loads them itself (the sidebar avatar).
+HEAVY = ("pandas", "pyarrow", "altair", "requests")
+
+# page -> (heavy libraries it may load, cold-start budget in ms)
+BUDGETS = {
+    "Home": ((), 1000),
+    "AI Assistant": (("requests",), 1200),
+    "Fundraising": ((), 1200),
+    "Investor Portal": (("pandas", "pyarrow", "altair"), 2500),
+    "Adaptive Tracker": (("pandas", "pyarrow", "altair", "requests"), 2500),
+}
+
+
+def _top_level(modules):
+    return {name.partition(".")[0] for name in modules}
+
+
+def measure(page, reruns):
+    """Runs in its own process: cold first run of `page`, then warm reruns."""
+    workdir = tempfile.mkdtemp(prefix="groflow-startup-")
+    os.environ.update({
+        "GROFLOW_DB": os.path.join(workdir, "groflow.db"),
+        "GROFLOW_REVENUE_DIR": os.path.join(workdir, "revenue"),
+        "GROFLOW_IMAGE_DIR": os.path.join(workdir, "media"),
+        "GROFLOW_PLAN_DIR": os.path.join(workdir, "plans"),
+        "GROFLOW_EVENT_LOG": os.path.join(workdir, "events.log"),
+    })
+    os.chdir(ROOT)
+    import logging
+    from streamlit.testing.v1 import AppTest
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    try:
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.session_state["page"] = page
+        before = set(sys.modules)
+        start = time.perf_counter()
+        at.run()
+        cold = time.perf_counter() - start
+        loaded = set(sys.modules) - before
+
+        times = []
+        for _ in range(reruns):
+            seen = set(sys.modules)
+            start = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - start)
+            # Anything new here is an import paid on every rerun (or a lazy one that never settles)
+            rerun_imports = sorted(set(sys.modules) - seen)
+            if rerun_imports:
+                break
+        times.sort()
+        return {
+            "cold_ms": round(cold * 1000, 1),
+            "rerun_p50_ms": round(times[len(times) // 2] * 1000, 1),
+            "modules_loaded": len(loaded),
+            "heavy": sorted(_top_level(loaded) & set(HEAVY)),
+            "rerun_imports": rerun_imports,
+            "exceptions": [str(e.value) for e in at.exception],
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start / import budget per page.")
+    parser.add_argument("--reruns", type=int, default=3)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every time budget")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--page", help=argparse.SUPPRESS)  # internal: measure one page
+    args = parser.parse_args()
+
+    if args.page:
+        print(json.dumps(measure(args.page, args.reruns)))
+        return
+
+    results, failures = {}, []
+    for page, (allowed, budget_ms) in BUDGETS.items():
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), f"--page={page}", f"--reruns={args.reruns}"],
+                             capture_output=True, text=True, cwd=ROOT)
+        if out.returncode:
+            print(out.stderr, file=sys.stderr)
+            sys.exit(out.returncode)
+        result = results[page] = json.loads(out.stdout.strip().splitlines()[-1])
+        budget_ms *= args.budget_scale
+        print(f"{page:<17} cold {result['cold_ms']:>7.1f} ms (budget {budget_ms:.0f})   "
+              f"rerun p50 {result['rerun_p50_ms']:>6.1f} ms   {result['modules_loaded']:>4} modules   "
+              f"heavy: {', '.join(result['heavy']) or '-'}")
+
+        if result["exceptions"]:
+            failures.append(f"{page}: raised {result['exceptions'][0]}")
+        unexpected = sorted(set(result["heavy"]) - set(allowed))
+        if unexpected:
+            failures.append(f"{page}: imports {', '.join(unexpected)} it doesn't need")
+        if result["rerun_imports"]:
+            failures.append(f"{page}: a rerun imported {', '.join(result['rerun_imports'][:5])}")
+        if result["cold_ms"] > budget_ms:
+            failures.append(f"{page}: cold start {result['cold_ms']:.0f} ms > {budget_ms:.0f} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("OK: every page within its import budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Local stand-in for the Gemini REST API, for benchmarks and offline runs.
+
+Answers generateContent and streamGenerateContent (SSE) after an injected
+delay. The first request for each model gets a 429 with a Retry-After header
+(so every run goes through backoff and failover), and --rate-429 turns a
+further random share of requests into 429s.
+Roadmap requests (a system prompt asking for JSON) get a valid phase list.
+
+    python bench/gemini_stub.py --port 8765 --latency 0.3 --rate-429 0.1
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta/models streamlit run app.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubConfig:
+    def __init__(self, latency=0.2, jitter=0.1, rate_429=0.0, retry_after=0.2, chunks=4, seed=0, first_429=True):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.first_429 = first_429
+        self.retry_after = retry_after
+        self.chunks = chunks
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self._models_seen = set()
+
+    def draw(self, model=None):
+        """(should this request get a 429?, how long to wait before answering)"""
+        with self._lock:
+            self.requests += 1
+            first = self.first_429 and model not in self._models_seen
+            self._models_seen.add(model)
+            throttle = first or self._rng.random() < self.rate_429
+            self.throttled += throttle
+            delay = max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0.0)
+        return throttle, delay
+
+
+def _answer(payload):
+    system = " ".join(part.get("text", "") for part in payload.get("systemInstruction", {}).get("parts", []))
+    prompt = " ".join(part.get("text", "") for content in payload.get("contents", [])
+                      for part in content.get("parts", []))
+    if "JSON" in system or "JSON" in prompt:
+        weeks = re.search(r"weeks? (\d+) to (\d+)", prompt)
+        first, last = (int(weeks.group(1)), int(weeks.group(2))) if weeks else (1, 4)
+        match = re.search(r"Generate (\d+) phases", prompt)
+        if match and not weeks:
+            last = int(match.group(1))
+        return json.dumps([{"phase": f"Week {w}: Stub phase", "tasks": [f"Task {w}a", f"Task {w}b"]}
+                           for w in range(first, last + 1)])
+    return "1. Post a story.\n2. Message three past customers.\n3. Restock the best seller."
+
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            # /v1beta/models/<model>:generateContent
+            throttle, delay = config.draw(self.path.split("?")[0].rsplit("/", 1)[-1].split(":")[0])
+            if throttle:
+                error = {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED",
+                                   "details": [{"retryDelay": f"{config.retry_after}s"}]}}
+                self._send(429, json.dumps(error).encode(), [("Retry-After", str(config.retry_after))])
+                return
+
+            text = _answer(payload)
+            usage = {"promptTokenCount": len(json.dumps(payload)) // 4, "candidatesTokenCount": len(text) // 4}
+            usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+            if ":streamGenerateContent" not in self.path:
+                time.sleep(delay)
+                body = {"candidates": [{"content": {"parts": [{"text": text}]}}], "usageMetadata": usage}
+                self._send(200, json.dumps(body).encode(), [("Content-Type", "application/json")])
+                return
+
+            # SSE: first chunk after half the delay, the rest spread over the other half
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            step = max(len(text) // config.chunks, 1)
+            pieces = [text[i:i + step] for i in range(0, len(text), step)]
+            time.sleep(delay / 2)
+            for n, piece in enumerate(pieces):
+                event = {"candidates": [{"content": {"parts": [{"text": piece}]}}]}
+                if n == len(pieces) - 1:
+                    event["usageMetadata"] = usage
+                self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                self.wfile.flush()
+                time.sleep(delay / 2 / len(pieces))
+            self.close_connection = True
+
+    return Handler
+
+
+def start(port=0, **config):
+    """Run the stub on a background thread; returns (server, config, base_url)."""
+    config = StubConfig(**config)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="gemini-stub", daemon=True).start()
+    return server, config, f"http://127.0.0.1:{server.server_port}/v1beta/models"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before answering")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--rate-429", type=float, default=0.1, help="share of requests answered with 429")
+    parser.add_argument("--no-first-429", action="store_true", help="don't throttle each model's first request")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    args = parser.parse_args()
+    server, _, base_url = start(args.port, latency=args.latency, jitter=args.jitter,
+                                rate_429=args.rate_429, retry_after=args.retry_after, first_429=not args.no_first_429)
+    print(f"Gemini stub on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
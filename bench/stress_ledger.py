@@ -0,0 +1,148 @@
+"""Concurrency stress test for the vouch / invest ledger.
+
+Hammers one SQLite marketplace from many threads (and optionally many
+processes) and then checks that no points or dollars were created or lost.
+
+    python bench/stress_ledger.py --threads 32 --vouches 200 --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import INVESTOR_MIN_POINTS, SQLiteRepository, STARTING_POINTS, STARTING_POOL  # noqa: E402
+
+
+def _hammer(path, worker, vouches, campaign_ids, results):
+    repo = SQLiteRepository(path)
+    user = f"user-{worker}"
+    ok = 0
+    for n in range(vouches):
+        key = uuid.uuid4().hex
+        if repo.vouch(user, campaign_ids[n % len(campaign_ids)], 10, idempotency_key=key):
+            ok += 1
+            # A retried click with the same key must not charge twice
+            repo.vouch(user, campaign_ids[n % len(campaign_ids)], 10, idempotency_key=key)
+        if n % 7 == 0:
+            repo.change_pool(user, 100, idempotency_key=uuid.uuid4().hex)
+        for campaign_id in campaign_ids:
+            try:
+                repo.invest(user, campaign_id, 500, idempotency_key=uuid.uuid4().hex)
+            except ValueError:
+                pass    # not at INVESTOR_MIN_POINTS yet; the vouches above may get it there
+    results.append(ok)
+
+
+def _check_rejections(repo, campaign_ids):
+    """Amounts that would run a transfer backwards (or do nothing) never reach the ledger."""
+    user = "user-rejects"
+    repo.get_wallet(user)
+    # A fresh campaign: unfunded, so an accepted invest can't hide behind "already funded"
+    fresh = repo.create_campaign(name="Rejection Check", owner="stress", desc="", goal=1000)
+    eligible = repo.create_campaign(name="Rejection Check (eligible)", owner="stress", desc="", goal=1000,
+                                    points=INVESTOR_MIN_POINTS)
+    ledger = repo._conn().execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    attempts = [
+        ("vouch -50", lambda: repo.vouch(user, campaign_ids[0], -50)),
+        ("vouch 0", lambda: repo.vouch(user, campaign_ids[0], 0)),
+        ("change_pool 0", lambda: repo.change_pool(user, 0)),
+        ("invest -4000", lambda: repo.invest(user, fresh, -4000)),
+        ("invest 0", lambda: repo.invest(user, fresh, 0)),
+        ("invest 2.5", lambda: repo.invest(user, eligible, 2.5)),
+        (f"invest below {INVESTOR_MIN_POINTS} points", lambda: repo.invest(user, fresh, 500)),
+    ]
+    failures = []
+    for name, attempt in attempts:
+        try:
+            attempt()
+        except ValueError:
+            continue
+        failures.append(f"{name} was accepted")
+    wallet = repo.get_wallet(user)
+    if (wallet["points"], wallet["investor_pool"]) != (STARTING_POINTS, STARTING_POOL):
+        failures.append(f"a rejected action changed the wallet: {wallet}")
+    if repo._conn().execute("SELECT COUNT(*) FROM transactions").fetchone()[0] != ledger:
+        failures.append("a rejected action wrote to the ledger")
+    return failures
+
+
+def _process(path, first_worker, threads, vouches, campaign_ids, queue):
+    results = []
+    pool = [
+        threading.Thread(target=_hammer, args=(path, first_worker + t, vouches, campaign_ids, results))
+        for t in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    queue.put(sum(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--vouches", type=int, default=100, help="vouch attempts per thread")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "stress.db")
+    repo = SQLiteRepository(path)
+    campaign_ids = [camp.id for camp in repo.list_campaigns()]
+    points_before = sum(camp.points for camp in repo.list_campaigns())
+
+    queue = multiprocessing.Queue()
+    started = time.perf_counter()
+    procs = [
+        multiprocessing.Process(
+            target=_process,
+            args=(path, p * args.threads, args.threads, args.vouches, campaign_ids, queue),
+        )
+        for p in range(args.processes)
+    ]
+    for proc in procs:
+        proc.start()
+    accepted = sum(queue.get() for _ in procs)
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - started
+
+    users = args.threads * args.processes
+    wallets = [repo.get_wallet(f"user-{w}") for w in range(users)]
+    campaigns = repo.list_campaigns()
+    points_after = sum(w["points"] for w in wallets) + sum(c.points for c in campaigns)
+    failures = _check_rejections(repo, campaign_ids)
+    funded = [c for c in campaigns if c.funded_by_investors]
+    audit = repo.audit()
+
+    print(f"{accepted} vouches accepted from {users} users in {elapsed:.2f}s "
+          f"({accepted / elapsed:,.0f} vouches/s)")
+    if points_after != points_before + users * STARTING_POINTS:
+        failures.append(f"points not conserved: {points_after} != {points_before + users * STARTING_POINTS}")
+    if sum(c.points for c in campaigns) != points_before + accepted * 10:
+        failures.append("campaign points don't match accepted vouches")
+    invested = sum(c.investor_funding for c in funded)
+    pools = sum(w["investor_pool"] for w in wallets)
+    deposits = repo._conn().execute("SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE kind = 'deposit'").fetchone()[0]
+    if pools + invested != users * STARTING_POOL + deposits:
+        failures.append("investor dollars not conserved")
+    if len(repo._conn().execute("SELECT id FROM investments").fetchall()) != len(funded):
+        failures.append("a campaign was funded more than once")
+    if audit["unbalanced_assets"] or audit["mismatched_accounts"]:
+        failures.append(f"ledger audit failed: {audit}")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    if not failures:
+        print("OK: balances conserved, ledger balanced, no double-spend")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from instrumentation import span, traced
+
+# --- SETTINGS ---
+LOG_PATH = os.environ.get("GROFLOW_EVENT_LOG", "events.log")
+FLUSH_INTERVAL = 0.05     # seconds between group fsyncs; appends in between share one
+SNAPSHOT_EVERY = 5000     # events applied between snapshots of the views
+
+# Event kinds. "wallet", "campaign" and "holding" set state (opening balances,
+# or a baseline taken from an existing database); the rest are changes.
+# "comment" is history only: the text and the counts live in SQLite.
+KINDS = ("wallet", "campaign", "holding", "vouch", "like", "deposit", "withdraw", "invest", "comment")
+
+
+class MarketViews:
+    """State folded from the event log: what each event kind does to the marketplace."""
+
+    def __init__(self):
+        self.points = {}                                  # user -> wallet points
+        self.investor_pool = {}                           # user -> USD in the pool
+        self.investor_investments = defaultdict(list)     # user -> [(campaign, amount)]
+        self.campaign_points = {}                         # campaign -> trust points
+        self.community_vouches = {}                       # campaign -> vouch count
+        self.likes = defaultdict(int)                     # campaign -> like count
+        self.events = 0
+
+    def apply(self, event):
+        kind, user, campaign, amount = event["k"], event.get("u"), event.get("c"), event.get("a", 0)
+        if kind == "wallet":
+            self.points[user] = event["p"]
+            self.investor_pool[user] = amount
+        elif kind == "campaign":
+            self.campaign_points[campaign] = amount
+            self.community_vouches[campaign] = event.get("v", 0)
+        elif kind == "holding":
+            self.investor_investments[user].append((campaign, amount))
+        elif kind == "vouch":
+            self.points[user] = self.points.get(user, 0) - amount
+            self.campaign_points[campaign] = self.campaign_points.get(campaign, 0) + amount
+            self.community_vouches[campaign] = self.community_vouches.get(campaign, 0) + 1
+        elif kind == "like":
+            self.likes[campaign] += 1
+        elif kind == "deposit":
+            self.investor_pool[user] = self.investor_pool.get(user, 0) + amount
+        elif kind == "withdraw":
+            self.investor_pool[user] = self.investor_pool.get(user, 0) - amount
+        elif kind == "invest":
+            self.investor_pool[user] = self.investor_pool.get(user, 0) - amount
+            self.investor_investments[user].append((campaign, amount))
+        self.events += 1
+
+    def copy(self):
+        views = MarketViews()
+        views.points = dict(self.points)
+        views.investor_pool = dict(self.investor_pool)
+        views.investor_investments = defaultdict(list, {
+            user: list(positions) for user, positions in self.investor_investments.items()
+        })
+        views.campaign_points = dict(self.campaign_points)
+        views.community_vouches = dict(self.community_vouches)
+        views.likes = defaultdict(int, self.likes)
+        views.events = self.events
+        return views
+
+    def to_dict(self):
+        return {
+            "points": self.points,
+            "investor_pool": self.investor_pool,
+            "investor_investments": self.investor_investments,
+            "campaign_points": self.campaign_points,
+            "community_vouches": self.community_vouches,
+            "likes": self.likes,
+            "events": self.events,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        views = cls()
+        views.points = data["points"]
+        views.investor_pool = data["investor_pool"]
+        views.investor_investments = defaultdict(list, {
+            user: [tuple(position) for position in positions] for user, positions in data["investor_investments"].items()
+        })
+        # JSON object keys are strings; campaign ids are ints everywhere else
+        views.campaign_points = {int(c): v for c, v in data["campaign_points"].items()}
+        views.community_vouches = {int(c): v for c, v in data["community_vouches"].items()}
+        views.likes = defaultdict(int, {int(c): v for c, v in data["likes"].items()})
+        views.events = data["events"]
+        return views
+
+
+class EventLog:
+    """Append-only JSON-lines log of marketplace events, with snapshotted views.
+
+    The log itself is only written by a relay: the repository records each
+    event in an outbox table inside the same SQLite transaction as the
+    action, and the relay copies committed rows here (one write and one
+    fsync per batch) under SQLite's write lock. Every line carries its
+    outbox id "i", so a relay that crashed after writing but before
+    clearing the outbox is detected by last_id() and nothing is written
+    twice or lost. read() and views() fold in whatever was written since the last
+    call (by this process or any other sharing the file), and every
+    SNAPSHOT_EVERY events the views are saved next to the log with the byte
+    offset they cover, so a restart replays only the tail.
+    """
+
+    def __init__(self, path=LOG_PATH, flush_interval=FLUSH_INTERVAL, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self._read_lock = threading.Lock()
+        self._views, self._offset = self._load_snapshot()
+        self._snapshot_events = self._views.events
+
+    # --- WRITING ---
+    @staticmethod
+    def event(kind, user=None, campaign=None, amount=0, **extra):
+        """A timestamped event dict, ready for the outbox."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown event kind {kind!r}")
+        event = {"t": round(time.time(), 3), "k": kind}
+        if user is not None:
+            event["u"] = user
+        if campaign is not None:
+            event["c"] = campaign
+        if amount:
+            event["a"] = amount
+        event.update(extra)
+        return event
+
+    def write(self, events):
+        """Append events (each with its outbox id "i") and fsync. Only the relay calls this."""
+        if not events:
+            return
+        # One write per batch: O_APPEND keeps it whole next to other processes' batches
+        with span("events.flush", events=len(events)), open(self.path, "ab") as f:
+            f.write(("\n".join(json.dumps(event, separators=(",", ":")) for event in events) + "\n").encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def last_id(self):
+        """Outbox id of the last event on disk (0 if none), after cutting off a torn last line.
+
+        Only safe while holding the relay's lock: nobody else may be appending.
+        """
+        try:
+            f = open(self.path, "r+b")
+        except FileNotFoundError:
+            return 0
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            start = max(size - 65536, 0)
+            f.seek(start)
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                # A crash mid-write: readers never consumed the partial line, so drop it
+                data = data[:data.rfind(b"\n") + 1]
+                f.truncate(start + len(data))
+            lines = data.splitlines()
+            return json.loads(lines[-1]).get("i", 0) if lines else 0
+
+    # --- READING ---
+    def events(self, start=0):
+        """Every event from byte offset `start` on, oldest first (for audits and replays)."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                for line in f:
+                    if line.endswith(b"\n"):
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def tail(self, offset):
+        """Yield (event, byte offset just past it) for each event written after byte offset `offset`.
+
+        Streams line by line, so catching up on a long log never holds it all
+        in memory; cheap when nothing was appended (one stat). Readers keep
+        the last offset they saw and pass it back next time.
+        """
+        try:
+            if os.path.getsize(self.path) <= offset:
+                return
+            f = open(self.path, "rb")
+        except OSError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return      # another process is mid-write: stop at the last complete line
+                offset += len(line)
+                yield json.loads(line), offset
+
+    def read(self, reader):
+        """reader(views) under the read lock, with the views caught up with the log.
+
+        The views are shared and change while the log is folded in, so
+        callers read what they need here (or take views(), a copy).
+        """
+        with self._read_lock:
+            for event, self._offset in self.tail(self._offset):
+                self._views.apply(event)
+            if self._views.events - self._snapshot_events >= self.snapshot_every:
+                self._save_snapshot()
+            return reader(self._views)
+
+    def views(self):
+        """A copy of the materialized views, caught up with the log (cheap to catch up when nothing was appended)."""
+        return self.read(MarketViews.copy)
+
+    def __len__(self):
+        return self.read(lambda views: views.events)
+
+    # --- SNAPSHOTS ---
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return MarketViews(), 0
+        # A snapshot past the end of the log belongs to some other (deleted) log
+        if data["offset"] > (os.path.getsize(self.path) if os.path.exists(self.path) else 0):
+            return MarketViews(), 0
+        return MarketViews.from_dict(data["views"]), data["offset"]
+
+    @traced("events.snapshot")
+    def _save_snapshot(self):
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"offset": self._offset, "views": self._views.to_dict()}, f, separators=(",", ":"))
+        os.replace(tmp, self.snapshot_path)   # readers see the old snapshot or the new one, never half
+        self._snapshot_events = self._views.events
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import span
+from prompt_builder import count_tokens, token_budget
+from response_cache import response_cache
+
+# --- SETTINGS ---
+# GEMINI_BASE_URL points every call somewhere else (e.g. bench/gemini_stub.py)
+BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/models")
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+CONNECT_TIMEOUT = 5    # seconds to open the TCP+TLS connection
+READ_TIMEOUT = 60      # seconds to wait for Google to answer
+POOL_SIZE = 20         # keep-alive connections shared by every session
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0     # 1s, 2s, 4s, 8s ... (+ jitter)
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeminiError(Exception):
+    """Raised when Gemini can't give us an answer (after retries)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class BudgetExceeded(GeminiError):
+    """A token allowance refused the call before it was sent (no model was involved)."""
+
+
+# --- SHARED CONNECTION POOL ---
+# Streamlit imports this module once per process, so every session reuses
+# the same keep-alive connections instead of paying a new handshake per click.
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Content-Type": "application/json"})
+                _session = session
+    return _session
+
+
+def _backoff_delay(attempt, response=None):
+    # Google tells us how long to wait on a 429 -> honour it
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), BACKOFF_CAP)
+            except ValueError:
+                pass
+        try:
+            for detail in response.json().get("error", {}).get("details", []):
+                delay = detail.get("retryDelay")
+                if delay:
+                    return min(float(delay.rstrip("s")), BACKOFF_CAP)
+        except (ValueError, AttributeError):
+            pass
+    delay = min(BACKOFF_BASE * (2 ** attempt), BACKOFF_CAP)
+    return delay + random.uniform(0, delay / 2)
+
+
+def _payload(prompt, system):
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    if system:
+        # Shared instructions travel separately from the per-call prompt
+        payload["systemInstruction"] = {"parts": [{"text": system}]}
+    return payload
+
+
+def _cache_prompt(prompt, system):
+    return f"{system}\n\n{prompt}" if system else prompt
+
+
+def cached_answer(prompt, models, system=None):
+    """The cached answer from any of `models` (preferred first), or None. Never hits the network.
+
+    Counts as one cache lookup however many models it checks.
+    """
+    return response_cache.get_any(models, _cache_prompt(prompt, system))
+
+
+def remember_answer(prompt, model, text, system=None):
+    """Cache an answer fetched with use_cache=False."""
+    response_cache.put(model, _cache_prompt(prompt, system), text)
+
+
+def _reserve(prompt, system, session):
+    tokens = count_tokens(system, prompt)
+    reason = token_budget.reserve(session, tokens)
+    if reason:
+        raise BudgetExceeded(reason)
+    return tokens
+
+
+def _used_tokens(data, default):
+    try:
+        return int(data["usageMetadata"]["totalTokenCount"])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def _extract_text(data):
+    try:
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        raise GeminiError("Gemini returned an empty answer.")
+
+
+# --- MAIN CALL ---
+def generate(prompt, key, model=DEFAULT_MODEL, max_retries=MAX_RETRIES, use_cache=True,
+             system=None, budget_session=None):
+    """Send one prompt to Gemini and return the text. Raises GeminiError.
+
+    system is sent as the systemInstruction; budget_session is whose token
+    allowance pays for the call (None = only the monthly one).
+    """
+    cache_prompt = _cache_prompt(prompt, system)
+    if use_cache:
+        cached = response_cache.get(model, cache_prompt)
+        if cached is not None:
+            return cached
+
+    url = f"{BASE_URL}/{model}:generateContent"
+    payload = _payload(prompt, system)
+    reserved = _reserve(prompt, system, budget_session)
+    session = get_session()
+
+    try:
+        for attempt in range(max_retries + 1):
+            try:
+                with span("http.gemini", model=model, attempt=attempt) as call:
+                    response = session.post(
+                        url,
+                        params={"key": key},
+                        json=payload,
+                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                    )
+                    call.set("status", response.status_code)
+            except requests.RequestException as e:
+                if attempt == max_retries:
+                    raise GeminiError(f"Connection Failed: {e}")
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                try:
+                    data = response.json()
+                except ValueError:  # a proxy's HTML page, a cut-off body...
+                    raise GeminiError("Malformed response from Gemini.") from None
+                text = _extract_text(data)
+                token_budget.settle(budget_session, reserved, _used_tokens(data, reserved + count_tokens(text)))
+                if use_cache:
+                    response_cache.put(model, cache_prompt, text)
+                return text
+
+            if response.status_code in RETRY_STATUSES and attempt < max_retries:
+                time.sleep(_backoff_delay(attempt, response))
+                continue
+
+            if response.status_code == 400:
+                raise GeminiError("Invalid API Key (Error 400). Please check for spaces.", 400)
+            if response.status_code == 429:
+                raise GeminiError("Too Many Requests. Wait 60 seconds.", 429)
+            raise GeminiError(f"Google Error {response.status_code}: {response.text}", response.status_code)
+    except GeminiError:
+        token_budget.settle(budget_session, reserved, 0)  # failed calls aren't billed
+        raise
+
+
+async def generate_async(prompt, key, model=DEFAULT_MODEL, max_retries=MAX_RETRIES, use_cache=True,
+                         system=None, budget_session=None):
+    # Runs the pooled call on a worker thread so an event loop can fan out
+    # many requests while still sharing the same keep-alive connections.
+    return await asyncio.to_thread(generate, prompt, key, model, max_retries, use_cache, system, budget_session)
+
+
+# --- STREAMING (Server-Sent Events) ---
+def stream_generate(prompt, key, model=DEFAULT_MODEL, max_retries=MAX_RETRIES, use_cache=True,
+                    system=None, budget_session=None):
+    """Yield the answer in pieces as Gemini writes it. Raises GeminiError."""
+    cache_prompt = _cache_prompt(prompt, system)
+    if use_cache:
+        cached = response_cache.get(model, cache_prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    url = f"{BASE_URL}/{model}:streamGenerateContent"
+    payload = _payload(prompt, system)
+    reserved = _reserve(prompt, system, budget_session)
+    session = get_session()
+
+    try:
+        # Retries are only safe before the first byte reaches the page
+        for attempt in range(max_retries + 1):
+            try:
+                # Time to the response headers; the body streams into the page afterwards
+                with span("http.gemini", model=model, attempt=attempt, stream=True) as call:
+                    response = session.post(
+                        url,
+                        params={"key": key, "alt": "sse"},
+                        json=payload,
+                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                        stream=True,
+                    )
+                    call.set("status", response.status_code)
+            except requests.RequestException as e:
+                if attempt == max_retries:
+                    raise GeminiError(f"Connection Failed: {e}")
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                break
+
+            if response.status_code in RETRY_STATUSES and attempt < max_retries:
+                delay = _backoff_delay(attempt, response)
+                response.close()    # an unread streamed body holds its pooled connection until closed
+                time.sleep(delay)
+                continue
+
+            with response:
+                if response.status_code == 400:
+                    raise GeminiError("Invalid API Key (Error 400). Please check for spaces.", 400)
+                if response.status_code == 429:
+                    raise GeminiError("Too Many Requests. Wait 60 seconds.", 429)
+                raise GeminiError(f"Google Error {response.status_code}: {response.text}", response.status_code)
+    except GeminiError:
+        token_budget.settle(budget_session, reserved, 0)  # failed calls aren't billed
+        raise
+
+    pieces = []
+    used = None
+    completed = False
+    try:
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    try:
+                        event = json.loads(line[5:])
+                        used = _used_tokens(event, used)
+                        parts = event["candidates"][0]["content"]["parts"]
+                    except (ValueError, KeyError, IndexError):
+                        continue
+                    text = "".join(part.get("text", "") for part in parts)
+                    if text:
+                        pieces.append(text)
+                        yield text
+            except requests.RequestException as e:
+                raise GeminiError(f"Connection lost while streaming: {e}")
+        completed = True
+    finally:
+        # Also when the stream breaks or the page stops reading (a rerun closes the generator):
+        # what was sent and received is billed, and the rest of the reservation is given back
+        answer = "".join(pieces)
+        token_budget.settle(budget_session, reserved, used or reserved + count_tokens(answer))
+    if use_cache and completed and pieces:
+        response_cache.put(model, cache_prompt, answer)
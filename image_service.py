@@ -0,0 +1,104 @@
+import hashlib
+import io
+import os
+import threading
+from functools import lru_cache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow missing -> we still dedupe and cache, just don't resize
+    Image = None
+
+# --- SETTINGS ---
+IMAGE_DIR = os.environ.get("GROFLOW_IMAGE_DIR", "media")
+THUMB_SIZE = (480, 360)   # card images never need more than this
+THUMB_QUALITY = 80
+REF_PREFIX = "img:"       # what campaign rows store for processed images
+
+_file_refs = {}           # (path, mtime, size) -> ref, so bundled jpgs are hashed once
+_file_refs_lock = threading.Lock()
+
+
+def _thumb_path(digest):
+    return os.path.join(IMAGE_DIR, f"{digest}.img")
+
+
+def _make_thumbnail(data):
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as img:
+        already_small = img.width <= THUMB_SIZE[0] and img.height <= THUMB_SIZE[1]
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(THUMB_SIZE)
+        out = io.BytesIO()
+        try:
+            img.save(out, format="WEBP", quality=THUMB_QUALITY, method=4)
+        except (OSError, KeyError):
+            # Pillow built without WebP support
+            img.convert("RGB").save(out, format="JPEG", quality=THUMB_QUALITY, optimize=True)
+    thumb = out.getvalue()
+    # A small, well-compressed original can beat re-encoding it
+    if already_small and len(data) <= len(thumb):
+        return data
+    return thumb
+
+
+def ingest(data):
+    """Decode an image once, store its thumbnail by content hash and return the ref to save.
+
+    ValueError if Pillow can't decode it.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _thumb_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(IMAGE_DIR, exist_ok=True)
+        try:
+            thumb = _make_thumbnail(data)
+        except OSError:
+            # UnidentifiedImageError (not an image) and truncated files are both OSErrors;
+            # ValueError is what the forms already show to the user
+            raise ValueError("Image could not be read") from None
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(thumb)
+        os.replace(tmp, path)  # atomic: other workers never see half a file
+    return REF_PREFIX + digest
+
+
+def _ref_for_file(path):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _file_refs_lock:
+        ref = _file_refs.get(key)
+    if ref is None:
+        with open(path, "rb") as f:
+            ref = ingest(f.read())
+        with _file_refs_lock:
+            _file_refs[key] = ref
+    return ref
+
+
+@lru_cache(maxsize=256)
+def _thumb_bytes(digest):
+    with open(_thumb_path(digest), "rb") as f:
+        return f.read()
+
+
+def card_image(image):
+    """What to hand st.image for a campaign's image field.
+
+    Remote URLs go straight to the browser; local files and uploads are
+    served as small cached thumbnails shared by every page and session.
+    """
+    if not image:
+        return None
+    if image.startswith(("http://", "https://")):
+        return image
+    if not image.startswith(REF_PREFIX):
+        if not os.path.exists(image):
+            return None
+        image = _ref_for_file(image)
+    try:
+        return _thumb_bytes(image[len(REF_PREFIX):])
+    except FileNotFoundError:
+        return None
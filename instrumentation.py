@@ -0,0 +1,226 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- SETTINGS ---
+# GROFLOW_TRACE_FILE=traces.jsonl  -> every finished trace appended as one OTLP/JSON line
+# GROFLOW_METRICS_PORT=9464        -> Prometheus text on http://localhost:9464/metrics
+# GROFLOW_DEV_PANEL=1              -> sidebar panel with the slowest spans of the last rerun
+TRACE_FILE = os.environ.get("GROFLOW_TRACE_FILE")
+METRICS_PORT = os.environ.get("GROFLOW_METRICS_PORT")
+DEV_PANEL = os.environ.get("GROFLOW_DEV_PANEL") == "1"
+SERVICE_NAME = "groflow"
+
+# Histogram buckets (seconds) for the Prometheus export
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current = contextvars.ContextVar("groflow_span", default=None)
+
+
+class Span:
+    """A timed operation. The first span with no open parent starts a new trace."""
+
+    def __init__(self, name, attrs, parent):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.span_id = os.urandom(8).hex()
+        # A parent that already ended (e.g. a fragment rerun after its page) can't adopt children
+        self.parent = parent if parent is not None and parent.end_ns is None else None
+        self.root = self.parent.root if self.parent else self
+        self.trace_id = self.root.trace_id if self.parent else os.urandom(16).hex()
+        if self.root is self:
+            self.spans = []     # finished spans of this trace
+            self._open = set()
+        self.root._open.add(self)
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter_ns()
+        self.end_ns = None
+        self.duration_ns = None
+        self.error = None
+
+    @property
+    def seconds(self):
+        return (self.duration_ns or 0) / 1e9
+
+    def set(self, key, value):
+        self.attrs[key] = value
+
+    def end(self, at_ns=None):
+        """Finish the span (at_ns backdates it, for spans cut off by a rerun)."""
+        if self.end_ns is not None:
+            return
+        if self.root is self:
+            # Anything still open under us was cut off (st.rerun, st.stop, an exception)
+            for child in list(self._open - {self}):
+                child.set("interrupted", True)
+                child.end(at_ns)
+        self.duration_ns = max(at_ns - self.start_ns, 0) if at_ns else time.perf_counter_ns() - self._t0
+        self.end_ns = self.start_ns + self.duration_ns
+        self.root._open.discard(self)
+        self.root.spans.append(self)
+        if _current.get() is self:
+            _current.set(self.parent)
+        _metrics.observe(self.name, self.seconds, self.error is not None)
+        if self.root is self and TRACE_FILE:
+            _export(self)
+
+
+def start_span(name, **attrs):
+    """Open a span by hand (for code that can't sit inside a with block); call .end() on it."""
+    s = Span(name, attrs, _current.get())
+    _current.set(s)
+    return s
+
+
+@contextmanager
+def span(name, **attrs):
+    s = start_span(name, **attrs)
+    try:
+        yield s
+    except Exception as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end()
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# --- RERUNS ---
+def begin_run(previous=None, **attrs):
+    """Start the root span of a script run.
+
+    A run that ended in st.rerun()/st.stop() never reaches its end() call,
+    so the previous run is closed here, backdated to its last finished span.
+    """
+    if previous is not None and previous.end_ns is None:
+        last = max((s.end_ns for s in previous.spans), default=None)
+        previous.set("interrupted", True)
+        previous.end(last)
+    _current.set(None)
+    return start_span("rerun", **attrs)
+
+
+def slowest(run, limit=10):
+    """The longest spans of a finished run, slowest first."""
+    if run is None:
+        return []
+    return sorted(run.spans, key=lambda s: s.duration_ns or 0, reverse=True)[:limit]
+
+
+# --- PROMETHEUS ---
+class _Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}   # span name -> [bucket counts..., +Inf count, sum, errors]
+
+    def observe(self, name, seconds, failed=False):
+        with self._lock:
+            series = self._series.setdefault(name, [0] * (len(BUCKETS) + 3))
+            series[bisect.bisect_left(BUCKETS, seconds)] += 1
+            series[-2] += seconds
+            series[-1] += failed
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP groflow_span_duration_seconds Time spent in instrumented operations.",
+            "# TYPE groflow_span_duration_seconds histogram",
+        ]
+        errors = ["# HELP groflow_span_errors_total Instrumented operations that raised.",
+                  "# TYPE groflow_span_errors_total counter"]
+        with self._lock:
+            series = {name: list(values) for name, values in self._series.items()}
+        for name, values in sorted(series.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), values):
+                cumulative += count
+                lines.append(f'groflow_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'groflow_span_duration_seconds_sum{{span="{label}"}} {values[-2]:.6f}')
+            lines.append(f'groflow_span_duration_seconds_count{{span="{label}"}} {cumulative}')
+            errors.append(f'groflow_span_errors_total{{span="{label}"}} {values[-1]}')
+        return "\n".join(lines + errors) + "\n"
+
+
+_metrics = _Metrics()
+prometheus_text = _metrics.prometheus_text
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics on a background thread (no-op unless a port is configured)."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+# --- OTLP/JSON EXPORT ---
+_export_lock = threading.Lock()
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(s):
+    data = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 1,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [_attribute(k, v) for k, v in s.attrs.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+    }
+    if s.parent:
+        data["parentSpanId"] = s.parent.span_id
+    return data
+
+
+def _export(root):
+    # Same shape as the OpenTelemetry Collector's file exporter: one request per line
+    line = json.dumps({"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+        "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [_otlp_span(s) for s in root.spans]}],
+    }]})
+    with _export_lock, open(TRACE_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
@@ -0,0 +1,162 @@
+import hashlib
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from gemini_client import GeminiError
+from instrumentation import span
+from model_router import router
+from response_cache import make_key
+
+# --- SETTINGS ---
+WORKERS = 4             # Gemini calls running at once per process
+MAX_FINISHED = 500      # finished jobs kept around for pages to come back to
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """One generation request. Chunks accumulate as Gemini streams them."""
+
+    def __init__(self, job_id, prompt, key, task, system=None, budget_session=None):
+        self.id = job_id
+        self.prompt = prompt
+        self.key = key
+        self.task = task
+        self.system = system
+        self.budget_session = budget_session
+        self.status = QUEUED
+        self.chunks = []
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._changed = threading.Condition()
+
+    @property
+    def text(self):
+        return "".join(self.chunks)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def _publish(self, chunk=None, status=None, error=None):
+        with self._changed:
+            if chunk:
+                self.chunks.append(chunk)
+            if status:
+                self.status = status
+            if error:
+                self.error = error
+            if self.finished:
+                self.finished_at = time.time()
+            self._changed.notify_all()
+
+    def follow(self, timeout=None):
+        """Yield everything written so far, then each new chunk until the job ends.
+
+        Safe to call from any number of script runs at once; raises the job's
+        GeminiError if it failed.
+        """
+        sent = 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._changed:
+                while sent == len(self.chunks) and not self.finished:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    self._changed.wait(remaining)
+                new = self.chunks[sent:]
+                sent += len(new)
+                done, error = self.finished, self.error
+            yield from new
+            if done and sent == len(self.chunks):
+                if error:
+                    raise error
+                return
+
+    def wait(self, timeout=None):
+        """Block until the job ends; returns the full text or raises its GeminiError.
+
+        TimeoutError if it's still running after `timeout` seconds (a partial
+        answer is never handed back as if it were the whole one).
+        """
+        for _ in self.follow(timeout):
+            pass
+        if not self.finished:
+            raise TimeoutError(f"{self.id} still {self.status} after {timeout}s")
+        if self.error:
+            raise self.error
+        return self.text
+
+
+class JobQueue:
+    """In-process worker pool for Gemini calls.
+
+    Script runs only submit and attach; the call itself runs on a worker
+    thread, so a rerun or page change never throws the work away. Identical
+    prompts (same task, API key and budget session) already queued or
+    running share one job; other users get theirs from response_cache.
+    """
+
+    def __init__(self, workers=WORKERS, max_finished=MAX_FINISHED):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()      # job id -> Job, oldest first
+        self._inflight = {}             # prompt key -> Job still queued/running
+        self._ids = itertools.count(1)
+        self._max_finished = max_finished
+        for n in range(workers):
+            threading.Thread(target=self._work, name=f"gemini-worker-{n}", daemon=True).start()
+
+    def submit(self, prompt, key, task, system=None, budget_session=None):
+        """Queue a prompt for a model_router task class and return its job id
+        (an existing one if this session already has the same prompt in flight)."""
+        # Never share across keys or sessions: the job runs on one key and bills one session
+        dedupe = (make_key(task, f"{system}\n\n{prompt}" if system else prompt),
+                  hashlib.sha256(str(key).encode()).hexdigest(), budget_session)
+        with self._lock:
+            job = self._inflight.get(dedupe)
+            if job is None:
+                job = Job(f"job-{next(self._ids)}", prompt, key, task, system, budget_session)
+                self._jobs[job.id] = job
+                self._inflight[dedupe] = job
+                self._queue.put((dedupe, job))
+            return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def _work(self):
+        while True:
+            dedupe, job = self._queue.get()
+            job._publish(status=RUNNING)
+            try:
+                with span("job", task=job.task, job_id=job.id):
+                    for chunk in router.stream(job.task, job.prompt, job.key,
+                                               system=job.system, budget_session=job.budget_session):
+                        job._publish(chunk)
+                job._publish(status=DONE)
+            except GeminiError as e:
+                job._publish(status=FAILED, error=e)
+            except Exception as e:  # never let one bad job kill the worker
+                job._publish(status=FAILED, error=GeminiError(f"Unexpected error: {e}"))
+            finally:
+                with self._lock:
+                    self._inflight.pop(dedupe, None)
+                    self._trim()
+                self._queue.task_done()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self._max_finished, 0)]:
+            del self._jobs[job_id]
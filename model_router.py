@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+
+from gemini_client import (MAX_RETRIES, RETRY_STATUSES, BudgetExceeded, GeminiError, cached_answer, generate,
+                           remember_answer, stream_generate)
+
+# --- TIERS ---
+# Acceptable models per task class, preferred first. Micro-actions are short
+# and latency-sensitive; multi-week JSON roadmaps need the stronger model.
+TIERS = {
+    "micro": ["gemini-2.5-flash-lite", "gemini-2.5-flash"],
+    "roadmap": ["gemini-2.5-pro", "gemini-2.5-flash"],
+    "coach": ["gemini-2.5-flash", "gemini-2.5-pro", "gemini-2.5-flash-lite"],
+}
+FAILOVER_STATUSES = RETRY_STATUSES | {404}   # 404: model retired or not enabled for the key
+
+
+def _fails_over(error):
+    # No status: a timeout or dropped connection, which the next model may well not hit
+    return error.status is None or error.status in FAILOVER_STATUSES
+
+# --- ADAPTIVE ROUTING ---
+WINDOW = 200             # latest calls per model used for the stats
+MIN_SAMPLES = 5          # below this a model's latency is treated as unknown
+PREFERENCE_PENALTY = 0.5  # each step down the tier must be this much faster to win
+COOLDOWN = 30.0          # seconds a model sits out after a 429
+ERROR_HORIZON = 300.0    # errors older than this stop counting, so a recovered model gets retried
+
+
+class ModelStats:
+    """Rolling latency and error rate for one model."""
+
+    def __init__(self, window=WINDOW):
+        self.latencies = deque(maxlen=window)   # seconds, successful calls only
+        self.outcomes = deque(maxlen=window)    # (time, succeeded)
+        self.cooling_until = 0.0
+
+    def percentile(self, q):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+    def recent(self):
+        since = time.monotonic() - ERROR_HORIZON
+        return [ok for at, ok in self.outcomes if at >= since]
+
+    @property
+    def error_rate(self):
+        recent = self.recent()
+        return 1 - sum(recent) / len(recent) if recent else 0.0
+
+
+class ModelRouter:
+    """Picks a model per task and fails over down the tier on 429/5xx/404 and timeouts.
+
+    The tier order is the default; a lower model moves up once it has been
+    clearly faster (p95 weighted by error rate) than the ones above it.
+    """
+
+    def __init__(self, tiers=TIERS):
+        self.tiers = tiers
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _model_stats(self, model):
+        with self._lock:
+            return self._stats.setdefault(model, ModelStats())
+
+    def order(self, task):
+        """The task's models in the order we should try them right now."""
+        models = self.tiers[task]
+        stats = [self._model_stats(model) for model in models]
+        latencies = [s.percentile(95) if len(s.latencies) >= MIN_SAMPLES else None for s in stats]
+        known = sorted(latency for latency in latencies if latency is not None)
+        typical = known[len(known) // 2] if known else 1.0
+        now = time.monotonic()
+
+        def key(i):
+            latency = typical if latencies[i] is None else latencies[i]
+            errors = stats[i].error_rate if len(stats[i].recent()) >= MIN_SAMPLES else 0.0
+            cooling = stats[i].cooling_until > now
+            return cooling, latency * (1 + 4 * errors) * (1 + PREFERENCE_PENALTY * i), i
+
+        return [models[i] for i in sorted(range(len(models)), key=key)]
+
+    def record(self, model, seconds=None, error=None):
+        stats = self._model_stats(model)
+        with self._lock:
+            stats.outcomes.append((time.monotonic(), error is None))
+            if error is None:
+                stats.latencies.append(seconds)
+            elif error.status == 429:
+                stats.cooling_until = time.monotonic() + COOLDOWN
+
+    def stats(self):
+        """Per-model p50/p95 latency (seconds), error rate and sample count."""
+        with self._lock:
+            models = list(self._stats.items())
+        return {
+            model: {
+                "p50": stats.percentile(50),
+                "p95": stats.percentile(95),
+                "error_rate": stats.error_rate,
+                "calls": len(stats.outcomes),
+            }
+            for model, stats in models
+        }
+
+    # --- CALLS ---
+    def _attempts(self, task, prompt, system, max_retries=None):
+        models = self.order(task)
+        # One cache lookup per call across the whole tier; the calls below skip their own
+        cached = cached_answer(prompt, models, system)
+        if cached is not None:
+            return None, cached
+        # One quick retry per model; the last one left gets the full retry budget
+        retries = [1 if i < len(models) - 1 else MAX_RETRIES for i in range(len(models))]
+        if max_retries is not None:
+            retries = [min(n, max_retries) for n in retries]
+        return list(zip(models, retries)), None
+
+    def generate(self, task, prompt, key, system=None, budget_session=None, max_retries=None):
+        """One answer for the task, failing over down the tier.
+
+        max_retries caps each model's own retries (0: a caller with its own rate
+        limiter does all the backing off).
+        """
+        attempts, cached = self._attempts(task, prompt, system, max_retries)
+        if cached is not None:
+            return cached
+        for model, retries in attempts:
+            start = time.monotonic()
+            try:
+                text = generate(prompt, key, model, retries, use_cache=False, system=system,
+                                budget_session=budget_session)
+            except BudgetExceeded:
+                raise   # refused before any model was asked; another model won't be cheaper
+            except GeminiError as e:
+                self.record(model, error=e)
+                if not _fails_over(e):
+                    raise
+                last_error = e
+                continue
+            self.record(model, time.monotonic() - start)
+            remember_answer(prompt, model, text, system)
+            return text
+        raise last_error
+
+    def stream(self, task, prompt, key, system=None, budget_session=None):
+        """Like stream_generate, failing over to the next model until the first chunk arrives."""
+        attempts, cached = self._attempts(task, prompt, system)
+        if cached is not None:
+            yield cached
+            return
+        for model, retries in attempts:
+            start = time.monotonic()
+            chunks = stream_generate(prompt, key, model, retries, use_cache=False, system=system,
+                                     budget_session=budget_session)
+            try:
+                first = next(chunks, None)
+            except BudgetExceeded:
+                raise
+            except GeminiError as e:
+                self.record(model, error=e)
+                if not _fails_over(e):
+                    raise
+                last_error = e
+                continue
+            pieces = []
+            try:
+                if first is not None:
+                    pieces.append(first)
+                    yield first
+                    for chunk in chunks:
+                        pieces.append(chunk)
+                        yield chunk
+            except GeminiError as e:
+                self.record(model, error=e)
+                raise
+            self.record(model, time.monotonic() - start)
+            if pieces:
+                remember_answer(prompt, model, "".join(pieces), system)
+            return
+        raise last_error
+
+
+# One router per process so every session learns from every call
+router = ModelRouter()
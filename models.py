@@ -0,0 +1,147 @@
+import datetime
+import sys
+
+COMMENT_MAX_CHARS = 1000
+
+
+def _text(value, field, required=False):
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be text, not {type(value).__name__}")
+    if required and not value.strip():
+        raise ValueError(f"{field} is required")
+    return value
+
+
+def _count(value, field, minimum=0):
+    # Whole numbers only (number_input may hand us 1000.0); bools are not counts
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+        raise ValueError(f"{field} must be a whole number, not {value!r}")
+    if value < minimum:
+        raise ValueError(f"{field} must be at least {minimum}")
+    return int(value)
+
+
+class Campaign:
+    """One marketplace business.
+
+    __slots__ instead of a dict: a fraction of the memory per campaign, and
+    every field is always there (counts default to 0, so a campaign made
+    from the form has the same shape as a seeded one). __init__ validates,
+    since that's how new campaigns are made; from_row() trusts rows SQLite
+    already holds.
+    """
+
+    __slots__ = ("id", "name", "owner", "desc", "points", "goal", "image", "funded_by_investors",
+                 "investor_funding", "community_vouches", "monthly_revenue", "months_in_business",
+                 "comment_count", "version", "progress")
+
+    def __init__(self, name, owner, goal, desc="", image=None, points=0, funded_by_investors=False,
+                 investor_funding=0, community_vouches=0, monthly_revenue=0, months_in_business=0,
+                 id=None, version=0):
+        self.id = id
+        self.name = _text(name, "Campaign name", required=True).strip()
+        self.owner = _text(owner, "Owner", required=True)
+        self.desc = _text(desc or "", "Description")
+        self.goal = _count(goal, "Goal", minimum=1)
+        if image is not None:
+            _text(image, "Image")
+        self.image = image
+        self.funded_by_investors = bool(funded_by_investors)
+        self.points = _count(points, "Points")
+        self.investor_funding = _count(investor_funding, "Investor funding")
+        self.community_vouches = _count(community_vouches, "Community vouches")
+        self.monthly_revenue = _count(monthly_revenue, "Monthly revenue")
+        self.months_in_business = _count(months_in_business, "Months in business")
+        self.comment_count = 0
+        self.version = version
+        self._set_progress()
+
+    @classmethod
+    def from_row(cls, row):
+        camp = cls.__new__(cls)
+        camp.id = row["id"]
+        camp.name = row["name"]
+        camp.owner = sys.intern(row["owner"])      # a few owners, many campaigns
+        camp.desc = row["desc"]
+        camp.points = row["points"]
+        camp.goal = row["goal"]
+        camp.image = row["image"]
+        camp.funded_by_investors = bool(row["funded_by_investors"])
+        camp.investor_funding = row["investor_funding"]
+        camp.community_vouches = row["community_vouches"]
+        camp.monthly_revenue = row["monthly_revenue"]
+        camp.months_in_business = row["months_in_business"]
+        camp.comment_count = row["comment_count"]     # kept in step with the comments table
+        camp.version = row["version"]
+        camp._set_progress()
+        return camp
+
+    def _set_progress(self):
+        # Computed once per change instead of by every card on every rerun
+        self.progress = min(self.points / self.goal, 1.0) if self.goal else 1.0
+
+    @property
+    def remaining(self):
+        """Trust points still missing before the goal (<= 0 once it's reached)."""
+        return self.goal - self.points
+
+    def __repr__(self):
+        return f"Campaign(id={self.id!r}, name={self.name!r}, points={self.points}/{self.goal})"
+
+
+class Investment:
+    """One investor position. The date is a datetime.date, not a formatted string."""
+
+    __slots__ = ("id", "campaign_id", "business", "amount", "date", "status")
+
+    def __init__(self, campaign_id, business, amount, date, status="Active", id=None):
+        self.id = id
+        self.campaign_id = _count(campaign_id, "Campaign", minimum=1)
+        self.business = _text(business, "Business", required=True)
+        self.amount = _count(amount, "Amount", minimum=1)
+        if not isinstance(date, datetime.date):
+            raise ValueError(f"Investment date must be a date, not {type(date).__name__}")
+        self.date = date
+        self.status = _text(status, "Status", required=True)
+
+    @classmethod
+    def from_row(cls, row):
+        inv = cls.__new__(cls)
+        inv.id = row["id"]
+        inv.campaign_id = row["campaign_id"]
+        inv.business = sys.intern(row["business"])
+        inv.amount = row["amount"]
+        inv.date = datetime.date.fromisoformat(row["date"])
+        inv.status = sys.intern(row["status"])     # SQLite returns a new "Active" per row
+        return inv
+
+    def __repr__(self):
+        return f"Investment(id={self.id!r}, business={self.business!r}, amount={self.amount}, date={self.date})"
+
+
+class Comment:
+    """One comment on a campaign, newest-first pages of which the card loads on demand."""
+
+    __slots__ = ("id", "campaign_id", "user_id", "body", "created_at")
+
+    def __init__(self, campaign_id, user_id, body, created_at, id=None):
+        self.id = id
+        self.campaign_id = _count(campaign_id, "Campaign", minimum=1)
+        self.user_id = _text(user_id, "User", required=True)
+        self.body = _text(body, "Comment", required=True).strip()
+        if len(self.body) > COMMENT_MAX_CHARS:
+            raise ValueError(f"Comment must be at most {COMMENT_MAX_CHARS} characters")
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, row):
+        comment = cls.__new__(cls)
+        comment.id = row["id"]
+        comment.campaign_id = row["campaign_id"]
+        comment.user_id = row["user_id"]
+        comment.body = row["body"]
+        comment.created_at = row["created_at"]
+        return comment
+
+    def __repr__(self):
+        return f"Comment(id={self.id!r}, campaign_id={self.campaign_id}, user_id={self.user_id!r})"
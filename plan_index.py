@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still serialized within this process, just not across processes
+    fcntl = None
+
+from instrumentation import span, traced
+
+# --- SETTINGS ---
+DATA_DIR = os.environ.get("GROFLOW_PLAN_DIR", "plan_data")
+DIM = 256                 # hashed feature buckets per plan
+SCALE = 127               # vectors are stored as int8: component * SCALE (256 bytes a plan)
+RECORD = np.dtype([("weeks", "<i2"), ("budget", "<f4"), ("offset", "<i8"), ("length", "<i4")])
+
+MATCH_THRESHOLD = 0.75    # below this a stored plan isn't close enough and we ask Gemini
+TOP_K = 3                 # suggestions offered at once
+BUDGET_WEIGHT = 0.15      # share of the score that depends on how similar the budgets are
+CHUNK_ROWS = 8192         # rows scored per matrix-vector product (stays in cache, bounds the float32 copy)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def vectorize(business, goal):
+    """Signed feature-hashed vector of words and character trigrams, L2-normalized.
+
+    Trigrams make "jewelry" close to "jewellery" and survive typos; the
+    whole word is one more feature, so exact terms still score highest.
+    """
+    vector = np.zeros(DIM, dtype=np.float32)
+    for field, text in (("b", business), ("g", goal)):
+        for word in _WORD.findall(str(text or "").lower()):
+            padded = f" {word} "
+            features = [f"{field}:{word}"] + [f"{field}#{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+            for feature in features:
+                h = zlib.crc32(feature.encode())
+                # The sign bit keeps hash collisions from piling up in one direction
+                vector[h % DIM] += 1 if h & 0x80000000 else -1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class PlanIndex:
+    """Past roadmaps, searchable by how similar their inputs were.
+
+    Three append-only files: the plans as JSON lines, one RECORD per plan
+    (weeks, budget and where its JSON starts) and one int8 vector per
+    plan. Scoring is a chunked matrix-vector product, so a few hundred
+    thousand plans take tens of milliseconds. Like RevenueStore, reads are
+    cached until the files grow, which also picks up plans other processes add.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._records = np.zeros(0, dtype=RECORD)
+        self._vectors = np.zeros((0, DIM), dtype=np.int8)
+        self._count = 0             # rows of _records/_vectors in use (the rest is spare capacity)
+
+    def _path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    def __len__(self):
+        self._refresh()
+        return self._count
+
+    # --- WRITING ---
+    @traced("plans.append")
+    def append(self, plans):
+        """Store (business, goal, weeks, budget, phases) tuples."""
+        if not plans:
+            return
+        os.makedirs(self.data_dir, exist_ok=True)
+        records = np.zeros(len(plans), dtype=RECORD)
+        vectors = np.empty((len(plans), DIM), dtype=np.int8)
+        # The thread lock covers this process, the flock every other process appending here
+        with self._lock, open(self._path("plans.lock"), "ab") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Plans are counted by records; cut anything a crashed append left past the last one
+            count = self._size("plans.rec") // RECORD.itemsize
+            with open(self._path("plans.jsonl"), "ab") as f:
+                f.seek(0, os.SEEK_END)
+                for n, (business, goal, weeks, budget, phases) in enumerate(plans):
+                    line = json.dumps({"business": business, "goal": goal, "budget": budget, "phases": phases}).encode() + b"\n"
+                    offset = f.tell()   # where this line actually lands, not where the last append ended
+                    f.write(line)
+                    records[n] = (weeks, budget, offset, len(line))
+                    vectors[n] = np.round(vectorize(business, goal) * SCALE)
+            # Vectors before records: a reader counts plans by records, so it never sees half of one
+            self._write_at("vectors.i8", count * DIM, vectors.tobytes())
+            self._write_at("plans.rec", count * RECORD.itemsize, records.tobytes())
+
+    def _size(self, name):
+        try:
+            return os.path.getsize(self._path(name))
+        except OSError:
+            return 0
+
+    def _write_at(self, name, position, data):
+        # Row n of a fixed-width file always starts at n * width, whatever a crash left behind
+        with open(self._path(name), "ab") as f:
+            f.truncate(position)    # appends land at the (new) end
+            f.write(data)
+            f.flush()
+
+    def record(self, business, goal, weeks, budget, phases):
+        self.append([(business, goal, int(weeks), float(budget), phases)])
+
+    # --- READING ---
+    def _refresh(self):
+        """Read whatever other writers (or we) appended since the last look."""
+        try:
+            total = os.path.getsize(self._path("plans.rec")) // RECORD.itemsize
+        except OSError:
+            return
+        with self._lock:
+            if total <= self._count:
+                return
+            new = total - self._count
+            records = np.fromfile(self._path("plans.rec"), dtype=RECORD, count=new,
+                                  offset=self._count * RECORD.itemsize)
+            vectors = np.fromfile(self._path("vectors.i8"), dtype=np.int8, count=new * DIM,
+                                  offset=self._count * DIM).reshape(new, DIM)
+            if total > len(self._records):
+                # Grow by doubling, so appending one plan at a time stays cheap overall
+                capacity = max(total, 2 * len(self._records), 1024)
+                self._records = np.resize(self._records, capacity)
+                grown = np.zeros((capacity, DIM), dtype=np.int8)
+                grown[:self._count] = self._vectors[:self._count]
+                self._vectors = grown
+            self._records[self._count:total] = records
+            self._vectors[self._count:total] = vectors
+            self._count = total
+
+    def _plan(self, record):
+        with open(self._path("plans.jsonl"), "rb") as f:
+            f.seek(int(record["offset"]))
+            return json.loads(f.read(int(record["length"])))
+
+    def nearest(self, business, goal, weeks, budget, k=TOP_K, threshold=MATCH_THRESHOLD):
+        """Up to k stored plans of the same length scoring at least `threshold`, best first.
+
+        Score = text cosine similarity, scaled down by up to BUDGET_WEIGHT as
+        the budgets drift apart (half the budget -> 7.5% lower).
+        """
+        self._refresh()
+        with span("plans.nearest", plans=self._count):
+            with self._lock:
+                count = self._count
+                records, vectors = self._records[:count], self._vectors[:count]
+            if not count:
+                return []
+            query = vectorize(business, goal) / SCALE
+            scores = np.empty(count, dtype=np.float32)
+            for start in range(0, count, CHUNK_ROWS):
+                scores[start:start + CHUNK_ROWS] = vectors[start:start + CHUNK_ROWS].astype(np.float32) @ query
+
+            budgets = records["budget"].astype(np.float32)
+            ratio = (np.minimum(budgets, budget) + 1) / (np.maximum(budgets, budget) + 1)
+            scores *= 1 - BUDGET_WEIGHT * (1 - ratio)
+            scores[records["weeks"] != weeks] = -1.0
+
+            k = min(k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results = []
+            for i in top:
+                if scores[i] < threshold:
+                    break
+                plan = self._plan(records[i])
+                plan.update(score=float(scores[i]), weeks=int(records["weeks"][i]))
+                results.append(plan)
+            return results
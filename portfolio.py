@@ -0,0 +1,220 @@
+import threading
+
+import numpy as np
+
+# --- ASSUMPTIONS ---
+# Every position is repaid like a small business loan: equal monthly
+# payments over TERM_MONTHS at the position's monthly rate. No repayments
+# are recorded, so every cash-flow metric below describes this schedule,
+# not how the investments actually performed.
+MONTHLY_RATE = 0.05
+TERM_MONTHS = 12
+
+
+class PortfolioStore:
+    """One investor's positions as NumPy columns, with running aggregates.
+
+    Appending a position updates the totals and concentration in O(1); the
+    cash-flow based metrics (schedule, IRR, time-weighted return) are
+    recomputed in vectorized form only when positions changed.
+    """
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.RLock()
+        self._n = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.campaign_ids = np.empty(capacity, dtype=np.int64)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        self.days = np.empty(capacity, dtype="datetime64[D]")
+        self.start_months = np.empty(capacity, dtype=np.int64)   # months since 1970-01
+        self.rates = np.empty(capacity, dtype=np.float64)
+        self.businesses = []
+        self.statuses = []
+        self.last_id = 0
+
+        # running aggregates
+        self.total = 0.0
+        self._by_campaign = {}      # campaign id -> total invested
+        self._sum_sq = 0.0          # sum of squared per-campaign totals (for HHI)
+        self._schedule = None       # cached (months, contributions, distributions, balances)
+
+    def __len__(self):
+        return self._n
+
+    # --- LOADING ---
+    def sync(self, repo, user_id):
+        """Pull only the investments recorded since the last sync."""
+        rows = repo.investments_since(user_id, self.last_id)
+        if rows:
+            self.extend(rows)
+
+    def extend(self, rows, rate=MONTHLY_RATE):
+        """Append Investment positions (older ones than last_id are skipped)."""
+        with self._lock:
+            rows = [row for row in rows if row.id > self.last_id]
+            if not rows:
+                return
+            count = len(rows)
+            self._reserve(self._n + count)
+            end = self._n + count
+            self.ids[self._n:end] = [row.id for row in rows]
+            self.campaign_ids[self._n:end] = [row.campaign_id for row in rows]
+            self.amounts[self._n:end] = [row.amount for row in rows]
+            self.days[self._n:end] = [row.date for row in rows]
+            self.start_months[self._n:end] = self.days[self._n:end].astype("datetime64[M]").astype(np.int64)
+            self.rates[self._n:end] = rate
+            self.businesses.extend(row.business for row in rows)
+            self.statuses.extend(row.status for row in rows)
+
+            for row in rows:
+                amount = float(row.amount)
+                before = self._by_campaign.get(row.campaign_id, 0.0)
+                self._by_campaign[row.campaign_id] = before + amount
+                self._sum_sq += (before + amount) ** 2 - before ** 2
+                self.total += amount
+            self._n = end
+            self.last_id = int(self.ids[end - 1])
+            self._schedule = None
+
+    def _reserve(self, size):
+        capacity = len(self.amounts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("ids", "campaign_ids", "amounts", "days", "start_months", "rates"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    # --- CONCENTRATION ---
+    def concentration(self):
+        """Herfindahl index (1/n = perfectly spread, 1 = all-in-one) and largest position share."""
+        if not self.total:
+            return {"hhi": 0.0, "top_share": 0.0, "businesses": 0}
+        return {
+            "hhi": self._sum_sq / self.total ** 2,
+            "top_share": max(self._by_campaign.values()) / self.total,
+            "businesses": len(self._by_campaign),
+        }
+
+    # --- CASH FLOWS ---
+    def schedule(self, term=TERM_MONTHS):
+        """Portfolio-wide monthly cash flows.
+
+        Returns (months, contributions, distributions, balances): month index
+        (since 1970-01), money going in, repayments coming out and outstanding
+        principal at the end of each month.
+        """
+        with self._lock:
+            if self._schedule is not None:
+                return self._schedule
+            n = self._n
+            if n == 0:
+                empty = np.zeros(0)
+                return np.zeros(0, dtype=np.int64), empty, empty, empty
+            amounts = self.amounts[:n]
+            rates = self.rates[:n]
+            starts = self.start_months[:n]
+            first = starts.min()
+            length = int(starts.max() - first) + term + 1
+            offset = (starts - first)[:, None]
+            k = np.arange(1, term + 1)[None, :]
+
+            # Level payment and remaining balance after k payments, all positions at once
+            growth = (1 + rates[:, None]) ** term
+            safe = np.where(rates > 0, rates, 1.0)[:, None]
+            payment = np.where(rates[:, None] > 0,
+                               amounts[:, None] * safe * growth / (growth - 1),
+                               amounts[:, None] / term)
+            grown_k = (1 + rates[:, None]) ** k
+            balance = np.where(rates[:, None] > 0,
+                               amounts[:, None] * (growth - grown_k) / (growth - 1),
+                               amounts[:, None] * (1 - k / term))
+
+            idx = (offset + k).ravel()
+            contributions = np.bincount((starts - first), weights=amounts, minlength=length)
+            distributions = np.bincount(idx, weights=np.broadcast_to(payment, balance.shape).ravel(), minlength=length)
+            balances = np.bincount(idx, weights=balance.ravel(), minlength=length)
+            balances += contributions  # a position is fully outstanding in its first month
+            self._schedule = (np.arange(first, first + length), contributions, distributions, balances)
+            return self._schedule
+
+    def irr(self, term=TERM_MONTHS):
+        """Annualized internal rate of return of the whole scheduled portfolio.
+
+        With every position on the same assumed rate this is that rate, annualized
+        (1.05 ** 12 - 1 for the default): label it as an assumption, not a result.
+        """
+        _, contributions, distributions, _ = self.schedule(term)
+        monthly = _irr(distributions - contributions)
+        return None if monthly is None else (1 + monthly) ** 12 - 1
+
+    def time_weighted_return(self, term=TERM_MONTHS):
+        """Chain-linked monthly returns of the schedule (Modified Dietz, flows at the start of the month)."""
+        _, contributions, distributions, balances = self.schedule(term)
+        if len(balances) == 0:
+            return None
+        previous = np.concatenate(([0.0], balances[:-1]))
+        invested = previous + contributions
+        valid = invested > 0
+        period = (balances[valid] + distributions[valid] - invested[valid]) / invested[valid]
+        return float(np.prod(1 + period) - 1)
+
+    def expected_monthly_income(self, month=None, term=TERM_MONTHS):
+        months, _, distributions, _ = self.schedule(term)
+        if len(months) == 0:
+            return 0.0
+        if month is None:
+            month = int(np.datetime64("today", "M").astype(np.int64)) + 1
+        pos = month - months[0]
+        return float(distributions[pos]) if 0 <= pos < len(distributions) else 0.0
+
+    def positions(self, limit=None):
+        """Latest positions as plain columns for a table (newest first)."""
+        with self._lock:
+            n = self._n
+            start = 0 if limit is None else max(n - limit, 0)
+            return {
+                "business": self.businesses[start:n][::-1],
+                "amount": self.amounts[start:n][::-1],
+                "date": self.days[start:n][::-1],
+                "status": self.statuses[start:n][::-1],
+            }
+
+
+def _irr(flows, guess=0.01, tol=1e-10, max_iter=100):
+    """Monthly IRR by Newton's method, falling back to bisection."""
+    flows = np.trim_zeros(np.asarray(flows, dtype=np.float64), "b")
+    if len(flows) < 2 or not (flows > 0).any() or not (flows < 0).any():
+        return None
+    t = np.arange(len(flows))
+
+    def npv(rate):
+        return np.sum(flows / (1 + rate) ** t)
+
+    rate = guess
+    for _ in range(max_iter):
+        discount = (1 + rate) ** t
+        value = np.sum(flows / discount)
+        slope = np.sum(-t * flows / (discount * (1 + rate)))
+        if slope == 0:
+            break
+        step = value / slope
+        rate -= step
+        if rate <= -0.99:
+            break
+        if abs(step) < tol:
+            return float(rate)
+
+    low, high = -0.99, 10.0
+    if npv(low) * npv(high) > 0:
+        return None
+    for _ in range(200):
+        mid = (low + high) / 2
+        if npv(low) * npv(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+    return float((low + high) / 2)
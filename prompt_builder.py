@@ -0,0 +1,148 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from storage import DB_PATH
+
+# --- BUDGETS ---
+# Input + output tokens. Cache hits are free and never count.
+SESSION_TOKEN_BUDGET = int(os.environ.get("GROFLOW_SESSION_TOKENS", 200_000))
+MONTHLY_TOKEN_BUDGET = int(os.environ.get("GROFLOW_MONTHLY_TOKENS", 20_000_000))
+CHARS_PER_TOKEN = 4       # Gemini's own rule of thumb for English text
+
+# --- SHARED SYSTEM INSTRUCTIONS ---
+# Sent once per request as Gemini's systemInstruction instead of being pasted
+# into every prompt; the per-call prompt only carries what actually changes.
+SYSTEM_PROMPTS = {
+    "quick_wins": """
+        Act as a productivity coach.
+        Give exactly 3 "Micro-Actions" the owner can do RIGHT NOW. No fluff.
+    """,
+    "roadmap": """
+        Act as a Project Manager.
+        OUTPUT FORMAT INSTRUCTION:
+        You must output ONLY valid JSON. Do not write intro text.
+        Structure the JSON as a list of phases, one per week. Example:
+        [{"phase": "Week 1: Setup", "tasks": ["Task A", "Task B"]}, {"phase": "Week 2: Launch", "tasks": ["Task C", "Task D"]}]
+    """,
+    "crisis_coach": """
+        Act as a Crisis Management Coach for a small business.
+        YOUR TASK:
+        1. CALCULATE the new required Daily Revenue to hit the goal.
+        2. ANALYZE why the gap exists based on the specific missed tasks (e.g., if they missed marketing, explain how that hurts sales).
+        3. GENERATE a strict "Recovery Plan" for the remaining days to catch up.
+        Keep it encouraging but strict. Maximum Efficiency focus.
+    """,
+}
+
+
+class Prompt(NamedTuple):
+    system: str
+    text: str
+
+
+def compact(text):
+    """Strip indentation and blank lines; single spaces inside each line."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def build(role, text):
+    return Prompt(compact(SYSTEM_PROMPTS[role]), compact(text))
+
+
+def count_tokens(*texts):
+    """Local estimate, so we can refuse a call before paying for it."""
+    return sum(math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts if text)
+
+
+# --- PROMPTS ---
+def quick_wins_prompt(energy, time_now, focus, platforms):
+    return build("quick_wins", f"Context: Energy={energy}, Time={time_now}, Focus={focus}, Platforms={platforms}.")
+
+
+def roadmap_prompt(business, goal, duration, budget):
+    return build("roadmap", f"""
+        Context: Business={business}, Goal={goal}, Duration={duration} weeks, Budget=${budget}.
+        Generate {duration} phases (one per week).
+    """)
+
+
+# --- BUDGET ENFORCEMENT ---
+class TokenBudget:
+    """Per-session and shared monthly token allowances.
+
+    reserve() books the estimated input before a call and refuses it if either
+    allowance would be exceeded; settle() swaps the estimate for what Gemini
+    reports it actually used (input + output). Sessions live in one process,
+    so their counters do too; the monthly total is a row in the shared
+    database's meta table, booked with one conditional UPDATE, so every
+    Streamlit worker draws on the same allowance.
+    """
+
+    def __init__(self, session_limit=SESSION_TOKEN_BUDGET, monthly_limit=MONTHLY_TOKEN_BUDGET, db_path=DB_PATH):
+        self.session_limit = session_limit
+        self.monthly_limit = monthly_limit
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = {}     # session id -> tokens used
+
+    def _conn(self):
+        # sqlite connections can't be shared across threads -> one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _month_key():
+        # A new month starts from a fresh row; old ones are kept as history
+        return f"tokens_{time.strftime('%Y-%m')}"
+
+    @property
+    def monthly_used(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (self._month_key(),)).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, session, tokens):
+        """Book `tokens`; returns why the call isn't allowed, or None if it is."""
+        with self._lock:
+            used = self._sessions.get(session, 0)
+            if session is not None and used + tokens > self.session_limit:
+                return f"Session AI budget used up ({used:,} of {self.session_limit:,} tokens)."
+            conn, month = self._conn(), self._month_key()
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, 0)", (month,))
+            # Check and book in one statement: two workers can't both take the last tokens
+            booked = conn.execute(
+                "UPDATE meta SET value = value + ? WHERE key = ? AND value + ? <= ?",
+                (tokens, month, tokens, self.monthly_limit),
+            ).rowcount
+            if not booked:
+                return "Monthly AI budget used up. Try again next month."
+            if session is not None:
+                self._sessions[session] = used + tokens
+            return None
+
+    def settle(self, session, reserved, actual):
+        with self._lock:
+            delta = actual - reserved
+            if delta:
+                self._conn().execute("UPDATE meta SET value = MAX(value + ?, 0) WHERE key = ?",
+                                     (delta, self._month_key()))
+            if session is not None:
+                self._sessions[session] = max(self._sessions.get(session, 0) + delta, 0)
+
+    def session_used(self, session):
+        with self._lock:
+            return self._sessions.get(session, 0)
+
+
+# One allowance per process for sessions, one per database for the month
+token_budget = TokenBudget()
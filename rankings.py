@@ -0,0 +1,167 @@
+import heapq
+import math
+import time
+
+# --- SETTINGS ---
+HALF_LIFE = 3 * 24 * 3600     # seconds for a vouch or like to lose half its weight
+WEIGHTS = {"vouch": 3.0, "like": 1.0}   # vouches cost points, so they count more than likes
+REVENUE_SCALE = 10_000        # monthly revenue ($) worth as much of a boost as a finished goal
+LEADERBOARD_SIZE = 120        # ids kept ranked per board (ten feed pages)
+EPOCH = 1_700_000_000         # fixed reference time for the decayed sums (any constant works)
+
+# Sort names the index understands on top of its numeric fields
+RANKINGS = ("trending", "momentum")
+
+
+def _logaddexp(a, b):
+    # log(e^a + e^b) without overflow: activity is stored as a log
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+
+class Leaderboard:
+    """The k best ids by key, kept current one change at a time.
+
+    A min-heap of the current members: a newcomer only has to beat the
+    weakest member (O(log k)) and a member whose key grows gets a fresh
+    entry, the old one being skipped when it surfaces. Keys are expected
+    to only grow (activity and progress accumulate); if one shrinks or a
+    member is removed, the board is marked stale and rebuilt on next read.
+    """
+
+    def __init__(self, k=LEADERBOARD_SIZE):
+        self.k = k
+        self._heap = []         # (key, id), may hold superseded entries
+        self._members = {}      # id -> key of its live heap entry
+        self._top = None        # best-first ids, until the next change
+        self.stale = False
+
+    def __len__(self):
+        return len(self._members)
+
+    def offer(self, item_id, key):
+        current = self._members.get(item_id)
+        if current is not None:
+            if key == current:
+                return
+            if key < current:
+                self.stale = True   # someone outside the board may now beat it
+            self._members[item_id] = key
+            heapq.heappush(self._heap, (key, item_id))
+        elif len(self._members) < self.k:
+            self._members[item_id] = key
+            heapq.heappush(self._heap, (key, item_id))
+        else:
+            weakest = self._weakest()
+            if (key, item_id) <= weakest:
+                return
+            del self._members[weakest[1]]
+            self._members[item_id] = key
+            heapq.heapreplace(self._heap, (key, item_id))
+        self._top = None
+        if len(self._heap) > 4 * self.k:
+            # Too many superseded entries: keep only the live ones
+            self._heap = [(key, item_id) for item_id, key in self._members.items()]
+            heapq.heapify(self._heap)
+
+    def _weakest(self):
+        heap = self._heap
+        while self._members.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def discard(self, item_id):
+        if self._members.pop(item_id, None) is not None:
+            self._top = None
+            self.stale = True
+
+    def rebuild(self, keys):
+        """Start over from {id: key} for every candidate."""
+        best = heapq.nlargest(self.k, ((key, item_id) for item_id, key in keys.items()))
+        self._members = {item_id: key for key, item_id in best}
+        self._heap = best[::-1]     # ascending order is already a valid min-heap
+        self._top = None
+        self.stale = False
+
+    def top(self):
+        if self._top is None:
+            self._top = [item_id for _, item_id in sorted(
+                ((key, item_id) for item_id, key in self._members.items()), reverse=True)]
+        return self._top
+
+
+class Rankings:
+    """Trending and momentum leaderboards for the campaign index.
+
+    momentum = vouches and likes, each decaying with HALF_LIFE
+    trending = momentum x (1 + progress toward the goal + revenue boost)
+
+    Everything decays at the same rate, so the order only changes when an
+    event or a campaign change arrives -- never because time passed. That
+    is what lets the leaderboards be updated incrementally: activity is
+    kept as log(sum of weight * e^(decay * (t - EPOCH))), which only grows.
+    Campaigns with no activity yet rank after active ones, by quality.
+    """
+
+    def __init__(self, k=LEADERBOARD_SIZE, half_life=HALF_LIFE):
+        self.decay = math.log(2) / half_life
+        self._activity = {}     # id -> log decayed vouch/like weight (EPOCH terms)
+        self._quality = {}      # id -> log(1 + progress + revenue boost); present = indexed
+        self.boards = {name: Leaderboard(k) for name in RANKINGS}
+        self.position = 0       # how far into the event log we've read
+
+    def observe(self, event):
+        """Fold in one event-log event; True if it changed any ranking."""
+        weight = WEIGHTS.get(event["k"])
+        if weight is None or "c" not in event:
+            return False
+        camp_id = event["c"]
+        activity = math.log(weight) + self.decay * (event["t"] - EPOCH)
+        before = self._activity.get(camp_id)
+        self._activity[camp_id] = activity if before is None else _logaddexp(before, activity)
+        self._rekey(camp_id)
+        return True
+
+    def update(self, camp):
+        revenue = math.log1p(camp.monthly_revenue) / math.log1p(REVENUE_SCALE)
+        self._quality[camp.id] = math.log(1 + camp.progress + revenue)
+        self._rekey(camp.id)
+
+    def remove(self, camp_id):
+        self._quality.pop(camp_id, None)
+        self._activity.pop(camp_id, None)
+        for board in self.boards.values():
+            board.discard(camp_id)
+
+    def key(self, ranking, camp_id):
+        activity = self._activity.get(camp_id, -math.inf)
+        quality = self._quality.get(camp_id, 0.0)
+        if ranking == "trending":
+            return (activity + quality, quality)
+        return (activity, quality)
+
+    def _rekey(self, camp_id):
+        # Events can name a campaign the index hasn't synced yet; it joins on update()
+        if camp_id in self._quality:
+            for name, board in self.boards.items():
+                board.offer(camp_id, self.key(name, camp_id))
+
+    def ordered(self, ranking):
+        """Ids best first: the leaderboard, then (only if the caller reads on) everyone else."""
+        board = self.boards[ranking]
+        if board.stale:
+            board.rebuild({camp_id: self.key(ranking, camp_id) for camp_id in self._quality})
+        top = board.top()
+        yield from top
+        if len(top) < len(self._quality):
+            ranked = set(top)
+            yield from sorted((camp_id for camp_id in self._quality if camp_id not in ranked),
+                              key=lambda camp_id: (self.key(ranking, camp_id), camp_id), reverse=True)
+
+    def score(self, camp_id, now=None):
+        """Trending score right now: decayed vouch/like weight times the quality boost."""
+        activity = self._activity.get(camp_id)
+        if activity is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return math.exp(activity - self.decay * (now - EPOCH) + self._quality.get(camp_id, 0.0))
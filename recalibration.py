@@ -0,0 +1,256 @@
+import argparse
+import csv
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from gemini_client import GeminiError
+from model_router import router
+from prompt_builder import build
+
+# --- WEEKLY MILESTONES ---
+# (cohort CSV column, checkbox label, how the coach prompt names a miss)
+MILESTONES = [
+    ("socials", "Posted 3x on Socials", "Social Media Posts"),
+    ("newsletter", "Sent Email Newsletter", "Email Newsletter"),
+    ("inventory", "Inventory Audit Done", "Inventory Audit"),
+    ("reviews", "Replied to Reviews", "Review Replies"),
+]
+
+# --- BATCH SETTINGS ---
+CONCURRENCY = 8          # Gemini calls in flight at once
+REQUESTS_PER_MINUTE = 60
+ROW_RETRIES = 2          # extra attempts for a row that was rate limited
+REPORT_COLUMNS = ["business", "target", "current", "gap", "days_left", "daily_needed",
+                  "execution_score", "missed", "status", "plan"]
+
+
+def execution_score(completed):
+    return int(sum(bool(done) for done in completed) / len(MILESTONES) * 100)
+
+
+def missed_text(completed):
+    missed = [name for (_, _, name), done in zip(MILESTONES, completed) if not done]
+    return ", ".join(missed) if missed else "None (Execution was perfect, but Revenue is low)"
+
+
+def build_prompt(target, current, days, completed):
+    """The Crisis Management Coach prompt used by the tracker and the batch runner."""
+    gap = target - current
+    return build("crisis_coach", f"""
+    CURRENT STATUS:
+    - Goal: ${target} | Current: ${current} | Gap: ${gap}
+    - Days Left: {days} days
+    - Execution Score: {execution_score(completed)}%
+
+    MISSED TASKS THIS WEEK:
+    {missed_text(completed)}
+    """)
+
+
+# --- COHORT INPUT ---
+def _flag(value):
+    return str(value).strip().lower() in ("1", "y", "yes", "true", "x", "done")
+
+
+def _number(value, default=0.0):
+    try:
+        return float(str(value).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return default
+
+
+def read_cohort(text):
+    """Rows of business,target,current,days_left plus one 0/1 column per milestone."""
+    rows = []
+    for raw in csv.DictReader(io.StringIO(text)):
+        raw = {(k or "").strip().lower(): v for k, v in raw.items()}
+        if not raw.get("business"):
+            continue
+        rows.append({
+            "business": raw["business"].strip(),
+            "target": _number(raw.get("target")),
+            "current": _number(raw.get("current")),
+            "days_left": max(int(_number(raw.get("days_left"), 1)), 1),
+            "completed": [_flag(raw.get(column, "")) for column, _, _ in MILESTONES],
+        })
+    return rows
+
+
+# --- RATE LIMITING ---
+class RateLimiter:
+    """Token bucket shared by every worker.
+
+    A 429 pauses every worker for a short, doubling delay and halves the rate;
+    each success adds a little back (AIMD), up to the configured rate.
+    """
+
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE):
+        self.max_rate = per_minute / 60.0
+        self.rate = self.max_rate
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._tokens + (now - self._updated) * self.rate, 1.0)
+                self._updated = now
+                wait_for = self._paused_until - now
+                if wait_for <= 0 and self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                if wait_for <= 0:
+                    wait_for = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+    def throttled(self, delay):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.rate = max(self.rate / 2, self.max_rate / 16)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate / 20, self.max_rate)
+
+
+# --- BATCH RUN ---
+def _recalibrate(row, key, task, limiter):
+    target, current, days = row["target"], row["current"], row["days_left"]
+    gap = target - current
+    result = {
+        "business": row["business"],
+        "target": target,
+        "current": current,
+        "gap": gap,
+        "days_left": days,
+        "daily_needed": round(max(gap, 0) / days, 2),
+        "execution_score": execution_score(row["completed"]),
+        "missed": missed_text(row["completed"]),
+    }
+    if gap <= 0:
+        return dict(result, status="on track", plan="")
+    prompt = build_prompt(target, current, days, row["completed"])
+    for attempt in range(ROW_RETRIES + 1):
+        limiter.acquire()
+        try:
+            # The router fails over between models; the limiter handles back-off for everyone, so the
+            # client doesn't retry on its own (it would keep hammering while the limiter throttles)
+            plan = router.generate(task, prompt.text, key, system=prompt.system, max_retries=0)
+        except GeminiError as e:
+            if e.status == 429 and attempt < ROW_RETRIES:
+                limiter.throttled(2.0 ** attempt)
+                continue
+            return dict(result, status="error", plan=str(e))
+        limiter.succeeded()
+        return dict(result, status="ok", plan=plan)
+
+
+def run_batch(rows, key, task="coach", concurrency=CONCURRENCY, per_minute=REQUESTS_PER_MINUTE):
+    """Recalibrate every row concurrently, yielding each result as soon as it's ready.
+
+    At most `concurrency` rows are in flight, so a huge cohort never builds a
+    huge backlog of futures.
+    """
+    limiter = RateLimiter(per_minute)
+    rows = iter(rows)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        for row in rows:
+            pending.add(pool.submit(_recalibrate, row, key, task, limiter))
+            if len(pending) >= concurrency:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                row = next(rows, None)
+                if row is not None:
+                    pending.add(pool.submit(_recalibrate, row, key, task, limiter))
+
+
+class ReportWriter:
+    """CSV report that grows one row at a time (to a file or an in-memory buffer)."""
+
+    def __init__(self, out=None):
+        self.out = out if out is not None else io.StringIO()
+        self._writer = csv.DictWriter(self.out, fieldnames=REPORT_COLUMNS)
+        self._writer.writeheader()
+
+    def add(self, result):
+        self._writer.writerow(result)
+        self.out.flush()
+
+    def getvalue(self):
+        return self.out.getvalue()
+
+
+class BatchRun:
+    """run_batch on a background thread, with the report so far readable at any time.
+
+    The page keeps the run (not the script run that started it), so reruns
+    and page changes only re-attach; each finished row lands in the report
+    before the next one is counted.
+    """
+
+    def __init__(self, rows, key, task="coach", concurrency=CONCURRENCY, per_minute=REQUESTS_PER_MINUTE):
+        self.total = len(rows)
+        self.done = 0
+        self.failed = 0
+        self.latest = None
+        self.error = None
+        self.finished = False
+        self._report = ReportWriter()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, args=(rows, key, task, concurrency, per_minute),
+                                        name="cohort-batch", daemon=True)
+        self._thread.start()
+
+    def _run(self, rows, key, task, concurrency, per_minute):
+        try:
+            for result in run_batch(rows, key, task, concurrency=concurrency, per_minute=per_minute):
+                with self._lock:
+                    self._report.add(result)
+                    self.done += 1
+                    self.failed += result["status"] == "error"
+                    self.latest = result
+        except Exception as e:  # the rows so far stay downloadable
+            self.error = e
+        finally:
+            self.finished = True
+
+    def report(self):
+        """The CSV for every row finished so far."""
+        with self._lock:
+            return self._report.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch AI Recalibrate for a cohort CSV.")
+    parser.add_argument("cohort", help="CSV: business,target,current,days_left," + ",".join(c for c, _, _ in MILESTONES))
+    parser.add_argument("--key", required=True, help="Gemini API key")
+    parser.add_argument("--out", default="-", help="report CSV (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=REQUESTS_PER_MINUTE, help="requests per minute")
+    args = parser.parse_args(argv)
+
+    with open(args.cohort, encoding="utf-8") as f:
+        rows = read_cohort(f.read())
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="", encoding="utf-8")
+    try:
+        report = ReportWriter(out)
+        for n, result in enumerate(run_batch(rows, args.key, concurrency=args.concurrency, per_minute=args.rpm), 1):
+            report.add(result)
+            print(f"[{n}/{len(rows)}] {result['business']}: {result['status']}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- SETTINGS ---
+DEFAULT_TTL = 60 * 60          # 1 hour: answers for the same inputs stay valid
+MEMORY_MAX_ENTRIES = 512
+PURGE_EVERY = 100              # disk puts between sweeps of expired rows
+# Set GROFLOW_CACHE_DB=/path/to/cache.db to share answers across Streamlit workers
+DISK_PATH = os.environ.get("GROFLOW_CACHE_DB")
+
+
+def normalize_prompt(prompt):
+    # Indentation and blank lines in our f-strings shouldn't create new cache keys
+    return " ".join(prompt.split())
+
+
+def make_key(model, prompt):
+    raw = f"{model}\n{normalize_prompt(prompt)}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache for Gemini answers."""
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES, disk_path=DISK_PATH, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()   # key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self._disk_path = disk_path
+        self._local = threading.local()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._puts = 0
+        if disk_path:
+            with self._disk() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " key TEXT PRIMARY KEY, expires_at REAL NOT NULL, text TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at)")
+
+    # --- DISK TIER ---
+    def _disk(self):
+        # sqlite connections can't be shared across threads -> one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._disk_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key, now):
+        row = self._disk().execute(
+            "SELECT expires_at, text FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] < now:
+            return None
+        return row
+
+    def _disk_put(self, key, expires_at, text):
+        with self._lock:
+            self._puts += 1
+            purge = self._puts % PURGE_EVERY == 0
+        with self._disk() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, expires_at, text) VALUES (?, ?, ?)",
+                (key, expires_at, text),
+            )
+            if purge:
+                # Expired rows are never served, but they'd stay on disk for good without this
+                conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+    # --- PUBLIC API ---
+    def get(self, model, prompt):
+        return self.get_any([model], prompt)
+
+    def get_any(self, models, prompt):
+        """The answer cached for the first of `models` that has one. One lookup, one hit or miss."""
+        now = time.time()
+        keys = [make_key(model, prompt) for model in models]
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is None:
+                    continue
+                if entry[0] >= now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+        if self._disk_path:
+            for key in keys:
+                row = self._disk_get(key, now)
+                if row is not None:
+                    with self._lock:
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return row[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, model, prompt, text, ttl=None):
+        key = make_key(model, prompt)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, text)
+        if self._disk_path:
+            self._disk_put(key, expires_at, text)
+
+    def _remember(self, key, expires_at, text):
+        self._memory[key] = (expires_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._disk_path:
+            with self._disk() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._memory),
+            }
+
+
+# One cache per process, shared by every session
+response_cache = ResponseCache()
@@ -0,0 +1,164 @@
+import csv
+import io
+import os
+import re
+import threading
+
+import numpy as np
+
+from instrumentation import traced
+
+# --- SETTINGS ---
+DATA_DIR = os.environ.get("GROFLOW_REVENUE_DIR", "revenue_data")
+RECORD = np.dtype([("day", "<i4"), ("revenue", "<f8")])   # 12 bytes per day
+
+TREND_WINDOW = 28     # days used to fit the current level and slope
+SEASON_WINDOW = 56    # days used to learn the weekday pattern
+CHART_POINTS = 200    # roughly what fits across the chart
+
+
+def _safe_name(business):
+    return re.sub(r"[^a-z0-9_-]+", "-", business.lower()).strip("-") or "business"
+
+
+def to_day(value):
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+class RevenueStore:
+    """Append-only daily revenue per business, one small binary file each.
+
+    Writes only ever append (day, revenue) records; if a day is recorded twice
+    the newest record wins when reading. Reads are cached until the file grows.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._cache = {}    # business -> (file size, days, revenue)
+        self._lock = threading.Lock()
+
+    def _path(self, business):
+        return os.path.join(self.data_dir, f"{_safe_name(business)}.rev")
+
+    # --- WRITING ---
+    @traced("revenue.append")
+    def append(self, business, days, revenue):
+        records = np.empty(len(days), dtype=RECORD)
+        records["day"] = days
+        records["revenue"] = revenue
+        os.makedirs(self.data_dir, exist_ok=True)
+        with self._lock, open(self._path(business), "ab") as f:
+            f.write(records.tobytes())
+
+    def record(self, business, day, revenue):
+        self.append(business, [to_day(day)], [float(revenue)])
+
+    def import_csv(self, business, text):
+        """Bulk import "date,revenue" rows (header optional). Returns how many rows were added."""
+        days, values = [], []
+        for row in csv.reader(io.StringIO(text)):
+            if len(row) < 2:
+                continue
+            try:
+                day = to_day(row[0].strip())
+                value = float(row[1].replace("$", "").replace(",", "").strip())
+            except ValueError:
+                continue  # header or junk line
+            days.append(day)
+            values.append(value)
+        if days:
+            order = np.argsort(days, kind="stable")
+            self.append(business, np.asarray(days)[order], np.asarray(values)[order])
+        return len(days)
+
+    # --- READING ---
+    def load(self, business):
+        """(days, revenue) sorted by day, one entry per day."""
+        path = self._path(business)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        with self._lock:
+            cached = self._cache.get(business)
+            if cached and cached[0] == size:
+                return cached[1], cached[2]
+        records = np.fromfile(path, dtype=RECORD)
+        # Newest record per day wins: keep the last occurrence of every day
+        reversed_days = records["day"][::-1]
+        days, first = np.unique(reversed_days, return_index=True)
+        revenue = records["revenue"][::-1][first]
+        days = days.astype(np.int64)
+        with self._lock:
+            self._cache[business] = (size, days, revenue)
+        return days, revenue
+
+    def daily(self, business, start_day, end_day):
+        """Dense series for [start_day, end_day]; days without a record count as 0."""
+        days, revenue = self.load(business)
+        series = np.zeros(end_day - start_day + 1)
+        mask = (days >= start_day) & (days <= end_day)
+        series[days[mask] - start_day] = revenue[mask]
+        return series
+
+
+# --- FORECASTING ---
+def forecast_month(store, business, target, today=None):
+    """Project month-end revenue from the recorded history.
+
+    Level and slope come from a least-squares fit over the last TREND_WINDOW
+    days; a weekday factor learned over SEASON_WINDOW days adds the weekly
+    pattern. Returns None if there's no history yet.
+    """
+    days, _ = store.load(business)
+    if len(days) == 0:
+        return None
+    today = to_day(today or np.datetime64("today", "D"))
+    month_start = int(np.datetime64(today, "D").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64))
+    month_end = int((np.datetime64(today, "D").astype("datetime64[M]") + 1).astype("datetime64[D]").astype(np.int64)) - 1
+
+    history_start = today - max(TREND_WINDOW, SEASON_WINDOW) + 1
+    history = store.daily(business, history_start, today)
+    t = np.arange(history_start, today + 1)
+
+    # Weekday seasonality (1970-01-01 was a Thursday -> (day + 3) % 7 == 0 is Monday)
+    weekday = (t + 3) % 7
+    season_mask = t > today - SEASON_WINDOW
+    overall = history[season_mask].mean()
+    season = np.ones(7)
+    if overall > 0:
+        sums = np.bincount(weekday[season_mask], weights=history[season_mask], minlength=7)
+        counts = np.bincount(weekday[season_mask], minlength=7)
+        season = np.where(counts > 0, sums / np.maximum(counts, 1) / overall, 1.0)
+        season = np.where(season > 0, season, 1.0)
+
+    # Trend on the deseasonalized series
+    trend_mask = t > today - TREND_WINDOW
+    x = t[trend_mask] - today
+    y = history[trend_mask] / season[weekday[trend_mask]]
+    slope, level = np.polyfit(x, y, 1) if len(x) > 1 else (0.0, float(y.mean()))
+
+    future = np.arange(today + 1, month_end + 1)
+    projected = np.maximum((level + slope * (future - today)) * season[(future + 3) % 7], 0.0)
+    month_to_date = float(store.daily(business, month_start, today).sum())
+    projected_total = month_to_date + float(projected.sum())
+    days_left = len(future)
+    return {
+        "month_to_date": month_to_date,
+        "projected_total": projected_total,
+        "projected_gap": max(target - projected_total, 0.0),
+        "days_left": days_left,
+        "required_run_rate": max(target - month_to_date, 0.0) / days_left if days_left else 0.0,
+        "forecast_days": future,
+        "forecast": projected,
+    }
+
+
+def downsample(days, values, max_points=CHART_POINTS):
+    """Bucket means so the chart never gets more points than it can draw."""
+    if len(values) <= max_points:
+        return days, values
+    edges = np.linspace(0, len(values), max_points + 1).astype(np.int64)
+    starts = edges[:-1]
+    sums = np.add.reduceat(values, starts)
+    return days[starts], sums / np.diff(edges)
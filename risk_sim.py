@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from portfolio import MONTHLY_RATE, TERM_MONTHS
+
+# --- MODEL ASSUMPTIONS ---
+# Revenue follows a log-normal random walk. Young businesses swing more and
+# default more often; community vouches are treated as a signal of demand
+# and dampen both. A business defaults when it stops earning enough to cover
+# the repayment, or by a baseline monthly hazard.
+REVENUE_DRIFT = 0.01          # +1%/month median growth
+BASE_VOLATILITY = 0.35        # monthly log-revenue volatility for a brand-new business
+BASE_HAZARD = 0.03            # monthly default hazard for a brand-new business
+COVERAGE_FLOOR = 1.5          # default if revenue < 1.5x the monthly repayment
+RECOVERY_RATE = 0.30          # share of the outstanding balance recovered on default
+
+DEFAULT_PATHS = 20_000
+PORTFOLIO_PATHS = 2_000       # sums over many positions settle with far fewer paths
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_CELLS = 1_000_000         # paths x positions simulated per batch (bounds memory)
+PROCESS_THRESHOLD = 200       # positions before we fan out to a process pool
+
+
+def _risk_profile(months_in_business, community_vouches):
+    tenure = np.asarray(months_in_business, dtype=np.float64)
+    vouches = np.asarray(community_vouches, dtype=np.float64)
+    trust = 1.0 / (1.0 + vouches / 50.0)
+    volatility = BASE_VOLATILITY / np.sqrt(1.0 + tenure / 6.0) * (0.5 + 0.5 * trust)
+    hazard = BASE_HAZARD * np.exp(-tenure / 24.0) * trust
+    return volatility, hazard
+
+
+def _simulate_batch(amounts, rates, revenue, months_in_business, community_vouches, term, n_paths, seed):
+    """Payoff of each path summed over the given positions, plus each path's default count."""
+    rng = np.random.default_rng(seed)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rates = np.asarray(rates, dtype=np.float64)
+    volatility, hazard = _risk_profile(months_in_business, community_vouches)
+    positions = len(amounts)
+
+    # The repayment schedule is fixed, so a path only has to decide *when*
+    # (if ever) each business defaults; the payoff is then a table lookup.
+    growth = (1 + rates) ** term
+    payment = np.where(rates > 0, amounts * rates * growth / np.where(growth > 1, growth - 1, 1), amounts / term)
+    k = np.arange(term + 1)[None, :]
+    grown_k = (1 + rates[:, None]) ** k
+    balance = np.where(rates[:, None] > 0,
+                       amounts[:, None] * (growth[:, None] - grown_k) / np.where(growth > 1, growth - 1, 1)[:, None],
+                       amounts[:, None] * (1 - k / term))
+    # payoff[d] = payments before defaulting in month d + recovery of what was left;
+    # d == term means the loan was repaid in full
+    payoff_table = payment[:, None] * k + RECOVERY_RATE * balance
+    payoff_table[:, term] = payment * term
+
+    shape = (n_paths, positions)
+    # Baseline hazard: the month of the first "bad luck" default, drawn in one go
+    default_month = np.minimum(rng.geometric(np.broadcast_to(hazard, shape)) - 1, term).astype(np.int16)
+
+    # Revenue shortfall: first month the simulated revenue can't cover the repayment
+    log_revenue = np.broadcast_to(np.log(np.maximum(np.asarray(revenue, dtype=np.float64), 1.0)),
+                                  shape).astype(np.float32)
+    step_drift = (REVENUE_DRIFT - volatility ** 2 / 2).astype(np.float32)
+    step_vol = volatility.astype(np.float32)
+    floor = np.log(COVERAGE_FLOOR * payment).astype(np.float32)
+    shock = np.empty(shape, dtype=np.float32)
+    for month in range(term):
+        rng.standard_normal(shape, dtype=np.float32, out=shock)
+        shock *= step_vol
+        shock += step_drift
+        log_revenue += shock
+        np.putmask(default_month, (log_revenue < floor) & (default_month > month), month)
+
+    flat = default_month + (np.arange(positions) * (term + 1))[None, :]
+    payoff = payoff_table.ravel()[flat]
+    return payoff.sum(axis=1), (default_month < term).sum(axis=1)
+
+
+def _summary(payoff, defaults, invested, positions):
+    profit = payoff - invested
+    bands = np.percentile(profit, PERCENTILES)
+    return {
+        "invested": float(invested),
+        "mean_profit": float(profit.mean()),
+        "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, bands)},
+        # chance that any one position defaults (= P(default) for a single investment)
+        "default_probability": float(defaults.mean() / positions),
+        "loss_probability": float((profit < 0).mean()),
+        "paths": int(len(profit)),
+    }
+
+
+def simulate_investment(amount, monthly_revenue, months_in_business, community_vouches,
+                        rate=MONTHLY_RATE, term=TERM_MONTHS, n_paths=DEFAULT_PATHS, seed=0):
+    """Profit percentiles and default probability for one proposed investment."""
+    payoff, defaults = _simulate_batch(
+        [amount], [rate], [monthly_revenue], [months_in_business], [community_vouches],
+        term, n_paths, seed,
+    )
+    return _summary(payoff, defaults, amount, 1)
+
+
+def simulate_portfolio(amounts, rates, monthly_revenue, months_in_business, community_vouches,
+                       term=TERM_MONTHS, n_paths=PORTFOLIO_PATHS, seed=0, processes=None):
+    """Same as simulate_investment but for every position at once (independent businesses).
+
+    Positions are split into batches that fit in MAX_CELLS; large portfolios
+    run those batches on a process pool.
+    """
+    columns = [np.asarray(c, dtype=np.float64) for c in
+               (amounts, rates, monthly_revenue, months_in_business, community_vouches)]
+    count = len(columns[0])
+    if count == 0:
+        return None
+    batch = max(1, MAX_CELLS // n_paths)
+    seeds = np.random.SeedSequence(seed).spawn((count + batch - 1) // batch)
+    jobs = [
+        tuple(c[start:start + batch] for c in columns) + (term, n_paths, seeds[i])
+        for i, start in enumerate(range(0, count, batch))
+    ]
+
+    payoff = np.zeros(n_paths)
+    defaults = np.zeros(n_paths, dtype=np.int64)
+    workers = processes or min(len(jobs), os.cpu_count() or 1)
+    if count >= PROCESS_THRESHOLD and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_simulate_batch, *zip(*jobs))
+            for batch_payoff, batch_defaults in results:
+                payoff += batch_payoff
+                defaults += batch_defaults
+    else:
+        for job in jobs:
+            batch_payoff, batch_defaults = _simulate_batch(*job)
+            payoff += batch_payoff
+            defaults += batch_defaults
+    return _summary(payoff, defaults, columns[0].sum(), count)
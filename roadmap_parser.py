@@ -0,0 +1,81 @@
+import json
+
+
+class PhaseStreamParser:
+    """Pulls complete {"phase": ..., "tasks": [...]} objects out of a text stream.
+
+    Feed it chunks as they arrive; every time a JSON object closes it is
+    decoded and, if it's a phase, returned, so the page can show Week 1
+    while Gemini is still writing Week 2. Objects are found at any depth,
+    so a wrapper like {"phases": [...]} still yields its phases one by one.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.phases = []
+        self._pos = 0          # next character of buffer to scan
+        self._open = []        # [start, found a phase inside] per unclosed object, outermost first
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        new_phases = []
+        buf = self.buffer
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == "{":
+                self._open.append([i, False])
+            elif ch == "}" and self._open:
+                start, found_inside = self._open.pop()
+                # An object holding phases is a wrapper, not a phase of its own
+                phase = None if found_inside else _decode_phase(buf[start:i + 1])
+                if phase is not None:
+                    new_phases.append(phase)
+                if (phase is not None or found_inside) and self._open:
+                    self._open[-1][1] = True
+            elif ch == '"' and self._open:
+                # Quotes only matter inside an object; prose around it can be messy
+                self._in_string = True
+        self._pos = len(buf)
+        self.phases.extend(new_phases)
+        return new_phases
+
+
+def _decode_phase(text):
+    try:
+        obj = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict) or "phase" not in obj:
+        return None
+    tasks = obj.get("tasks") or []
+    if not isinstance(tasks, list):
+        tasks = [tasks]
+    return {"phase": str(obj["phase"]), "tasks": [str(task) for task in tasks]}
+
+
+# --- CONTINUATIONS ---
+def continuation_prompt(context, phases, duration):
+    # Only ask for the weeks we don't have yet instead of paying for the whole plan again
+    done = len(phases)
+    covered = "\n".join(f"- {phase['phase']}" for phase in phases)
+    # Sent with the "roadmap" system prompt, which already carries the JSON format rules
+    return f"""
+    Context: {context}
+    
+    A {duration}-week plan was already started. These phases are DONE:
+    {covered}
+    
+    Generate ONLY weeks {done + 1} to {duration} ({duration - done} phases), starting with
+    {{"phase": "Week {done + 1}: ...", "tasks": [...]}}
+    """
@@ -0,0 +1,216 @@
+import bisect
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from itertools import islice
+
+from rankings import RANKINGS, Rankings
+
+TEXT_FIELDS = ("name", "owner", "desc")
+NUMERIC_FIELDS = ("points", "community_vouches", "monthly_revenue", "months_in_business", "remaining")
+
+QUERY_CACHE_SIZE = 256  # distinct query() results kept until the catalogue next changes
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _WORD.findall(str(text or "").lower())
+
+
+class CampaignIndex:
+    """In-memory search over the campaign catalogue.
+
+    - inverted index (token -> ids) over name / owner / desc
+    - one sorted (value, id) list per numeric field for range filters and sorting
+    - "remaining" (goal - points) powers the "closest to goal" ranking
+    - trending / momentum leaderboards (rankings.Rankings) fed from the event log
+    - derived views (eligible set, sort orders, leaderboards) memoized per
+      catalogue version, so every session shares one computed copy
+
+    Kept up to date incrementally: sync() only pulls rows whose change
+    sequence is newer than the last one we saw, and log events past the
+    last position read.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs = {}                     # id -> Campaign
+        self._tokens = {}                   # id -> set of tokens
+        self._postings = defaultdict(set)   # token -> ids
+        self._vocab = []                    # sorted tokens, for prefix search
+        self._sorted = {field: [] for field in NUMERIC_FIELDS}
+        self._ids = []                      # sorted ids = newest last
+        self._results = OrderedDict()       # query args -> ids, dropped on any change
+        self.rankings = Rankings()
+        self.seq = -1                       # last catalogue change we've applied
+
+    # --- MAINTENANCE ---
+    def sync(self, repo):
+        """Apply every campaign change and logged vouch/like since the last sync (cheap when nothing changed)."""
+        version = repo.catalogue_version()
+        with self._lock:
+            if version != self.seq:
+                for camp in repo.campaigns_changed_since(self.seq):
+                    self.upsert(camp)
+                self.seq = version
+            changed = False
+            # Streamed: the first sync on a long log never holds it all in memory
+            for event, position in repo.events_since(self.rankings.position):
+                changed |= self.rankings.observe(event)
+                self.rankings.position = position
+            if changed:
+                # Likes don't touch the catalogue: only the ranked results went stale
+                for key in [key for key in self._results if key[2] in RANKINGS]:
+                    del self._results[key]
+
+    def upsert(self, camp):
+        with self._lock:
+            self._results.clear()
+            camp_id = camp.id
+            if camp_id in self._docs:
+                self._unindex(camp_id)
+            else:
+                bisect.insort(self._ids, camp_id)
+            self._docs[camp_id] = camp
+            self.rankings.update(camp)
+            tokens = set()
+            for field in TEXT_FIELDS:
+                tokens.update(tokenize(getattr(camp, field)))
+            self._tokens[camp_id] = tokens
+            for token in tokens:
+                if not self._postings[token]:
+                    bisect.insort(self._vocab, token)
+                self._postings[token].add(camp_id)
+            for field in NUMERIC_FIELDS:
+                bisect.insort(self._sorted[field], (_value(camp, field), camp_id))
+
+    def remove(self, camp_id):
+        with self._lock:
+            self._results.clear()
+            if camp_id in self._docs:
+                self._unindex(camp_id)
+                del self._docs[camp_id]
+                del self._tokens[camp_id]
+                del self._ids[bisect.bisect_left(self._ids, camp_id)]
+                self.rankings.remove(camp_id)
+
+    def _unindex(self, camp_id):
+        old = self._docs[camp_id]
+        for token in self._tokens[camp_id]:
+            ids = self._postings[token]
+            ids.discard(camp_id)
+            if not ids:
+                del self._postings[token]
+                pos = bisect.bisect_left(self._vocab, token)
+                if pos < len(self._vocab) and self._vocab[pos] == token:
+                    del self._vocab[pos]
+        for field in NUMERIC_FIELDS:
+            entries = self._sorted[field]
+            pos = bisect.bisect_left(entries, (_value(old, field), camp_id))
+            if pos < len(entries) and entries[pos][1] == camp_id:
+                del entries[pos]
+
+    # --- LOOKUPS ---
+    def get(self, camp_id):
+        return self._docs.get(camp_id)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def search(self, text):
+        """Ids matching every word of text; the last word also matches as a prefix ("spi" -> spices)."""
+        words = tokenize(text)
+        if not words:
+            return None
+        with self._lock:
+            *exact, last = words
+            prefix_sets = []
+            pos = bisect.bisect_left(self._vocab, last)
+            while pos < len(self._vocab) and self._vocab[pos].startswith(last):
+                prefix_sets.append(self._postings[self._vocab[pos]])
+                pos += 1
+            exact_sets = [self._postings.get(word, set()) for word in exact]
+            if not prefix_sets or not all(exact_sets):
+                return set()
+
+            # Start from the rarest word and only ever shrink that set
+            exact_sets.sort(key=len)
+            if exact_sets:
+                result = exact_sets[0].intersection(*exact_sets[1:])
+                return {i for i in result if any(i in ids for ids in prefix_sets)}
+            return set().union(*prefix_sets)
+
+    def range(self, field, low=None, high=None):
+        """Ids whose field is in [low, high], in ascending order of that field."""
+        entries = self._sorted[field]
+        with self._lock:
+            start = 0 if low is None else bisect.bisect_left(entries, (low, -1))
+            end = len(entries) if high is None else bisect.bisect_right(entries, (high, float("inf")))
+            return [camp_id for _, camp_id in entries[start:end]]
+
+    def query(self, text="", filters=None, sort=None, descending=False, limit=None, offset=0):
+        """Full-text + range filters + ordering, returning a list of ids.
+
+        filters: {field: (low, high)}; sort: a numeric field, "closest", one of
+        RANKINGS ("trending", "momentum"; best first) or None (newest last).
+        Results are memoized until the next catalogue change; callers get their own copy.
+        """
+        key = (tuple(tokenize(text)), tuple(sorted((filters or {}).items())), sort, descending, limit, offset)
+        with self._lock:
+            hits = self._results.get(key)
+            if hits is None:
+                hits = self._results[key] = self._query(text, filters, sort, descending, limit, offset)
+                if len(self._results) > QUERY_CACHE_SIZE:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(key)
+            return list(hits)
+
+    def _query(self, text, filters, sort, descending, limit, offset):
+        with self._lock:
+            candidates = self.search(text)
+            for field, (low, high) in (filters or {}).items():
+                ids = set(self.range(field, low, high))
+                candidates = ids if candidates is None else candidates & ids
+
+            end = None if limit is None else offset + limit
+            if candidates is not None and len(candidates) * 8 < len(self._docs):
+                # Few hits: sorting them directly beats walking the whole index
+                if sort == "closest":
+                    hits = [i for i in candidates if _value(self._docs[i], "remaining") > 0]
+                    hits.sort(key=lambda i: (_value(self._docs[i], "remaining"), i))
+                elif sort in RANKINGS:
+                    hits = sorted(candidates, key=lambda i: (self.rankings.key(sort, i), i), reverse=True)
+                elif sort in NUMERIC_FIELDS:
+                    hits = sorted(candidates, key=lambda i: (_value(self._docs[i], sort), i), reverse=descending)
+                else:
+                    hits = sorted(candidates, reverse=descending)
+                return tuple(hits[offset:end])
+
+            ordered = self._ordered(sort, descending)
+            if candidates is not None:
+                ordered = (camp_id for camp_id in ordered if camp_id in candidates)
+            # Lazily walk the sorted index and stop once the page is full
+            return tuple(islice(ordered, offset, end))
+
+    def _ordered(self, sort, descending):
+        if sort == "closest":
+            # Still short of the goal, smallest gap first
+            entries = self._sorted["remaining"]
+            start = bisect.bisect_left(entries, (1, -1))
+            return (entries[i][1] for i in range(start, len(entries)))
+        if sort in RANKINGS:
+            # Top of the leaderboard straight from its heap; the rest is only sorted if paged into
+            return self.rankings.ordered(sort)
+        if sort in NUMERIC_FIELDS:
+            entries = self._sorted[sort]
+            if descending:
+                return (camp_id for _, camp_id in reversed(entries))
+            return (camp_id for _, camp_id in entries)
+        return reversed(self._ids) if descending else iter(self._ids)
+
+
+def _value(camp, field):
+    # Every Campaign has every field ("remaining" is a property), so no fallbacks
+    return getattr(camp, field)
@@ -0,0 +1,734 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from event_log import EventLog
+from instrumentation import traced
+from models import Campaign, Comment, Investment
+
+# --- SETTINGS ---
+DB_PATH = os.environ.get("GROFLOW_DB", "groflow.db")
+
+STARTING_POINTS = 120
+STARTING_POOL = 5000  # Starting liquidity pool
+INVESTOR_MIN_POINTS = 1000  # Trust Points a campaign needs before investors can fund it
+
+# The three demo businesses every fresh marketplace starts with
+SEED_CAMPAIGNS = [
+    {
+        "name": "EcoWraps",
+        "owner": "Sarah S.",
+        "desc": "Replacing plastic wrap with organic beeswax sheets.",
+        "points": 850,
+        "goal": 1000,
+        "image": "ecowraps.jpg",
+        "community_vouches": 42,
+        "monthly_revenue": 2500,
+        "months_in_business": 8,
+    },
+    {
+        "name": "WoodToys",
+        "owner": "ToyCraft",
+        "desc": "Safe, non-toxic toys made from reclaimed wood.",
+        "points": 400,
+        "goal": 1000,
+        "image": "woodtoys.jpg",
+        "community_vouches": 18,
+        "monthly_revenue": 1800,
+        "months_in_business": 5,
+    },
+    {
+        "name": "KeralaSpices",
+        "owner": "SpiceRoute",
+        "desc": "Authentic homemade spice blends from Kerala.",
+        "points": 1200,
+        "goal": 1000,
+        "image": "spices.jpg",
+        "community_vouches": 65,
+        "monthly_revenue": 3200,
+        "months_in_business": 12,
+    },
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    name                TEXT    NOT NULL,
+    owner               TEXT    NOT NULL,
+    description         TEXT    NOT NULL DEFAULT '',
+    points              INTEGER NOT NULL DEFAULT 0,
+    goal                INTEGER NOT NULL,
+    image               TEXT,
+    funded_by_investors INTEGER NOT NULL DEFAULT 0,
+    investor_funding    INTEGER NOT NULL DEFAULT 0,
+    community_vouches   INTEGER NOT NULL DEFAULT 0,
+    monthly_revenue     INTEGER NOT NULL DEFAULT 0,
+    months_in_business  INTEGER NOT NULL DEFAULT 0,
+    comment_count       INTEGER NOT NULL DEFAULT 0,
+    version             INTEGER NOT NULL DEFAULT 0,
+    changed_seq         INTEGER NOT NULL DEFAULT 0,
+    created_at          REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_points ON campaigns (points);
+CREATE INDEX IF NOT EXISTS idx_campaigns_changed ON campaigns (changed_seq);
+
+-- catalogue_version goes up on every campaign change, so in-memory
+-- indexes and caches can tell (with one tiny query) whether they're stale
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT    PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('catalogue_version', 0);
+
+CREATE TABLE IF NOT EXISTS wallets (
+    user_id       TEXT    PRIMARY KEY,
+    points        INTEGER NOT NULL,
+    investor_pool INTEGER NOT NULL,
+    version       INTEGER NOT NULL DEFAULT 0
+);
+
+-- Ledger: every vouch / deposit / withdrawal / investment is one transaction
+-- whose entries sum to zero per asset, so balances can always be audited.
+CREATE TABLE IF NOT EXISTS transactions (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT    UNIQUE,
+    kind            TEXT    NOT NULL,
+    user_id         TEXT    NOT NULL,
+    campaign_id     INTEGER REFERENCES campaigns (id),
+    amount          INTEGER NOT NULL,
+    created_at      REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_campaign ON transactions (campaign_id, kind);
+CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions (user_id, id);
+
+CREATE TABLE IF NOT EXISTS entries (
+    transaction_id INTEGER NOT NULL REFERENCES transactions (id),
+    account        TEXT    NOT NULL,
+    asset          TEXT    NOT NULL,
+    amount         INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_account ON entries (account, asset);
+
+CREATE TABLE IF NOT EXISTS investments (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns (id),
+    user_id     TEXT    NOT NULL,
+    business    TEXT    NOT NULL,
+    amount      INTEGER NOT NULL,
+    date        TEXT    NOT NULL,
+    status      TEXT    NOT NULL DEFAULT 'Active',
+    created_at  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_investments_user ON investments (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_investments_campaign ON investments (campaign_id);
+
+-- (campaign_id, id) serves every page of a campaign's comments by keyset,
+-- however many it has; campaigns.comment_count is the cached total
+CREATE TABLE IF NOT EXISTS comments (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns (id),
+    user_id     TEXT    NOT NULL,
+    body        TEXT    NOT NULL,
+    created_at  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_comments_campaign ON comments (campaign_id, id);
+
+-- One like per user per campaign; the count itself is folded from the event log
+CREATE TABLE IF NOT EXISTS likes (
+    user_id     TEXT    NOT NULL,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns (id),
+    created_at  REAL    NOT NULL,
+    PRIMARY KEY (user_id, campaign_id)
+) WITHOUT ROWID;
+
+-- Events committed with their action and not yet copied to the event log
+CREATE TABLE IF NOT EXISTS outbox (
+    id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT    NOT NULL
+);
+"""
+
+# Columns added to SCHEMA after the first release, for databases created before them:
+# (table, column, definition)
+ADDED_COLUMNS = [
+    ("campaigns", "comment_count", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+CAMPAIGN_COLUMNS = """
+    id, name, owner, description AS "desc", points, goal, image,
+    funded_by_investors, investor_funding, community_vouches,
+    monthly_revenue, months_in_business, comment_count, version
+"""
+
+# Ledger accounts / assets
+EXTERNAL = "external"   # money and points entering or leaving the marketplace
+POINTS = "points"
+USD = "usd"
+
+
+def wallet_account(user_id):
+    return f"wallet:{user_id}"
+
+
+def campaign_account(campaign_id):
+    return f"campaign:{campaign_id}"
+
+
+def _positive(amount, what):
+    # The SQL below only checks balances; a negative amount would run the transfer backwards
+    if amount <= 0:
+        raise ValueError(f"{what} must be positive, not {amount!r}")
+
+
+class MarketplaceRepository:
+    """Everything the pages need to read or change in the shared marketplace.
+
+    Pages only talk to this interface, so the SQLite default can be swapped
+    for another SQL database without touching app.py.
+    """
+
+    def list_campaigns(self):
+        raise NotImplementedError
+
+    def list_campaigns_page(self, after_id=None, limit=12):
+        raise NotImplementedError
+
+    def get_campaign(self, campaign_id):
+        raise NotImplementedError
+
+    def eligible_campaigns(self, min_points):
+        raise NotImplementedError
+
+    def create_campaign(self, name, owner, desc, goal, image=None, **extra):
+        raise NotImplementedError
+
+    def catalogue_version(self):
+        raise NotImplementedError
+
+    def campaigns_changed_since(self, seq):
+        raise NotImplementedError
+
+    def get_wallet(self, user_id):
+        raise NotImplementedError
+
+    def vouch(self, user_id, campaign_id, cost, idempotency_key=None):
+        raise NotImplementedError
+
+    def change_pool(self, user_id, delta, idempotency_key=None):
+        raise NotImplementedError
+
+    def invest(self, user_id, campaign_id, amount, idempotency_key=None):
+        raise NotImplementedError
+
+    def like(self, user_id, campaign_id):
+        raise NotImplementedError
+
+    def like_count(self, campaign_id):
+        raise NotImplementedError
+
+    def like_counts(self, campaign_ids):
+        raise NotImplementedError
+
+    def add_comment(self, user_id, campaign_id, body):
+        raise NotImplementedError
+
+    def list_comments(self, campaign_id, before_id=None, limit=5):
+        raise NotImplementedError
+
+    def events_since(self, position):
+        raise NotImplementedError
+
+    def list_investments(self, user_id):
+        raise NotImplementedError
+
+    def investments_since(self, user_id, after_id):
+        raise NotImplementedError
+
+    def audit(self):
+        raise NotImplementedError
+
+
+class SQLiteRepository(MarketplaceRepository):
+    """SQLite (WAL mode) so several Streamlit processes can share one file.
+
+    With an EventLog attached, every action also writes its event to the
+    outbox table in the same transaction, so an action and its event are
+    committed (or lost) together. A background relay copies the outbox to
+    the log every FLUSH_INTERVAL. SQLite holds the current state and stays
+    the concurrency guard; the log is the complete, replayable history the
+    like counts, rankings and audit are read from.
+    """
+
+    def __init__(self, path=DB_PATH, events=None):
+        self.path = path
+        self.events = events
+        self._local = threading.local()
+        self._relay_wanted = threading.Event()
+        self._relayer = None
+        self._relayer_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        self._migrate()
+        if events is not None:
+            self._relay()   # whatever an earlier process committed but didn't copy
+        self._seed()
+        if events is not None:
+            self._baseline_events()
+
+    # --- CONNECTIONS ---
+    def _conn(self):
+        # sqlite connections can't be shared across threads -> one per script thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def _migrate(self):
+        # CREATE TABLE IF NOT EXISTS leaves older databases without newer columns
+        with self._transaction() as conn:
+            for table, column, definition in ADDED_COLUMNS:
+                if column not in {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _seed(self):
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM campaigns LIMIT 1").fetchone():
+                return
+            for fields in SEED_CAMPAIGNS:
+                camp = self._insert_campaign(conn, Campaign(**fields))
+                self._emit(conn, "campaign", campaign=camp.id, amount=camp.points, v=camp.community_vouches)
+
+    # --- EVENT LOG ---
+    def _emit(self, conn, kind, **fields):
+        # Must run inside the transaction of the action it records
+        if self.events is not None:
+            conn.execute("INSERT INTO outbox (event) VALUES (?)",
+                         (json.dumps(self.events.event(kind, **fields), separators=(",", ":")),))
+            self._wake_relay()
+
+    def _wake_relay(self):
+        if self._relayer is None:
+            with self._relayer_lock:
+                if self._relayer is None:
+                    self._relayer = threading.Thread(target=self._relay_loop, name="event-relay", daemon=True)
+                    self._relayer.start()
+        self._relay_wanted.set()
+
+    def _relay_loop(self):
+        while True:
+            self._relay_wanted.wait()
+            time.sleep(self.events.flush_interval)   # a burst of actions shares one fsync
+            self._relay_wanted.clear()
+            try:
+                self._relay()
+            except (sqlite3.Error, OSError):
+                pass    # the rows stay in the outbox; the next action or read retries
+
+    def _relay(self):
+        """Copy committed outbox rows to the event log, exactly once."""
+        if self._conn().execute("SELECT 1 FROM outbox LIMIT 1").fetchone() is None:
+            return
+        # The write lock serializes relays across processes, so the log's tail is ours to inspect
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT id, event FROM outbox ORDER BY id").fetchall()
+            if not rows:
+                return
+            # Rows a crashed relay already wrote (but couldn't delete) aren't written again
+            written = self.events.last_id()
+            self.events.write([dict(json.loads(row["event"]), i=row["id"]) for row in rows if row["id"] > written])
+            conn.execute("DELETE FROM outbox WHERE id <= ?", (rows[-1]["id"],))
+
+    def _baseline_events(self):
+        # A database that predates its event log: record where everything stands now
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM outbox LIMIT 1").fetchone() or len(self.events):
+                return
+            for row in conn.execute("SELECT user_id, points, investor_pool FROM wallets ORDER BY user_id").fetchall():
+                self._emit(conn, "wallet", user=row["user_id"], amount=row["investor_pool"], p=row["points"])
+            for row in conn.execute("SELECT id, points, community_vouches FROM campaigns ORDER BY id").fetchall():
+                self._emit(conn, "campaign", campaign=row["id"], amount=row["points"], v=row["community_vouches"])
+            for row in conn.execute("SELECT user_id, campaign_id, amount FROM investments ORDER BY id").fetchall():
+                self._emit(conn, "holding", user=row["user_id"], campaign=row["campaign_id"], amount=row["amount"])
+
+    # --- CAMPAIGNS ---
+    def list_campaigns(self):
+        rows = self._conn().execute(f"SELECT {CAMPAIGN_COLUMNS} FROM campaigns ORDER BY id")
+        return [Campaign.from_row(row) for row in rows]
+
+    def list_campaigns_page(self, after_id=None, limit=12):
+        # Keyset pagination on the primary key: cost doesn't grow with the page number
+        rows = self._conn().execute(
+            f"SELECT {CAMPAIGN_COLUMNS} FROM campaigns WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id or 0, limit),
+        )
+        return [Campaign.from_row(row) for row in rows]
+
+    def get_campaign(self, campaign_id):
+        row = self._conn().execute(
+            f"SELECT {CAMPAIGN_COLUMNS} FROM campaigns WHERE id = ?", (campaign_id,)
+        ).fetchone()
+        return Campaign.from_row(row) if row else None
+
+    def eligible_campaigns(self, min_points):
+        rows = self._conn().execute(
+            f"SELECT {CAMPAIGN_COLUMNS} FROM campaigns WHERE points >= ? ORDER BY id",
+            (min_points,),
+        )
+        return [Campaign.from_row(row) for row in rows]
+
+    @traced("db.create_campaign")
+    def create_campaign(self, name, owner, desc, goal, image=None, **extra):
+        """Store a new campaign and return its id. ValueError (before any write) if a field is invalid."""
+        camp = Campaign(name=name, owner=owner, desc=desc, goal=goal, image=image, **extra)
+        with self._transaction() as conn:
+            self._insert_campaign(conn, camp)
+            self._emit(conn, "campaign", campaign=camp.id, amount=camp.points, v=camp.community_vouches)
+        return camp.id
+
+    def _insert_campaign(self, conn, camp):
+        cursor = conn.execute(
+            "INSERT INTO campaigns (name, owner, description, points, goal, image, funded_by_investors,"
+            " investor_funding, community_vouches, monthly_revenue, months_in_business, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (camp.name, camp.owner, camp.desc, camp.points, camp.goal, camp.image, camp.funded_by_investors,
+             camp.investor_funding, camp.community_vouches, camp.monthly_revenue, camp.months_in_business,
+             time.time()),
+        )
+        camp.id = cursor.lastrowid
+        self._touch(conn, camp.id)
+        if camp.points:
+            # Seeded points still have to come from somewhere for the books to balance
+            self._record(conn, None, "opening", camp.owner, camp.id, camp.points,
+                         [(EXTERNAL, POINTS, -camp.points), (campaign_account(camp.id), POINTS, camp.points)])
+        return camp
+
+    def catalogue_version(self):
+        return self._conn().execute(
+            "SELECT value FROM meta WHERE key = 'catalogue_version'"
+        ).fetchone()[0]
+
+    def campaigns_changed_since(self, seq):
+        rows = self._conn().execute(
+            f"SELECT {CAMPAIGN_COLUMNS} FROM campaigns WHERE changed_seq > ? ORDER BY changed_seq",
+            (seq,),
+        )
+        return [Campaign.from_row(row) for row in rows]
+
+    def _touch(self, conn, campaign_id):
+        # Must run inside the same transaction as the change it announces
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalogue_version'")
+        conn.execute(
+            "UPDATE campaigns SET changed_seq = (SELECT value FROM meta WHERE key = 'catalogue_version')"
+            " WHERE id = ?",
+            (campaign_id,),
+        )
+
+    # --- WALLETS ---
+    def get_wallet(self, user_id):
+        row = self._conn().execute(
+            "SELECT points, investor_pool, version FROM wallets WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            self._open_wallet(user_id)
+            return self.get_wallet(user_id)
+        return {"points": row["points"], "investor_pool": row["investor_pool"], "version": row["version"]}
+
+    def _open_wallet(self, user_id):
+        with self._transaction() as conn:
+            created = conn.execute(
+                "INSERT OR IGNORE INTO wallets (user_id, points, investor_pool) VALUES (?, ?, ?)",
+                (user_id, STARTING_POINTS, STARTING_POOL),
+            ).rowcount
+            if created:
+                account = wallet_account(user_id)
+                self._record(conn, None, "opening", user_id, None, STARTING_POINTS,
+                             [(EXTERNAL, POINTS, -STARTING_POINTS), (account, POINTS, STARTING_POINTS),
+                              (EXTERNAL, USD, -STARTING_POOL), (account, USD, STARTING_POOL)])
+                self._emit(conn, "wallet", user=user_id, amount=STARTING_POOL, p=STARTING_POINTS)
+
+    # --- LEDGER ---
+    # Each action is one short BEGIN IMMEDIATE transaction made of conditional
+    # ("compare-and-set") UPDATEs: balances are never read into Python and
+    # written back, so concurrent vouchers can't lose updates or double-spend.
+    # The idempotency key makes a double-clicked / retried action a no-op.
+    def _already_applied(self, conn, idempotency_key):
+        if idempotency_key is None:
+            return False
+        return conn.execute(
+            "SELECT 1 FROM transactions WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone() is not None
+
+    def _record(self, conn, idempotency_key, kind, user_id, campaign_id, amount, legs):
+        cursor = conn.execute(
+            "INSERT INTO transactions (idempotency_key, kind, user_id, campaign_id, amount, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (idempotency_key, kind, user_id, campaign_id, amount, time.time()),
+        )
+        conn.executemany(
+            "INSERT INTO entries (transaction_id, account, asset, amount) VALUES (?, ?, ?, ?)",
+            [(cursor.lastrowid, account, asset, value) for account, asset, value in legs],
+        )
+        return cursor.lastrowid
+
+    # --- ACTIONS ---
+    @traced("db.vouch")
+    def vouch(self, user_id, campaign_id, cost, idempotency_key=None):
+        """Move `cost` points from the user to the campaign. False if they can't afford it.
+
+        ValueError (before any write) unless cost is positive.
+        """
+        _positive(cost, "Vouch cost")
+        self.get_wallet(user_id)
+        with self._transaction() as conn:
+            if self._already_applied(conn, idempotency_key):
+                return True
+            paid = conn.execute(
+                "UPDATE wallets SET points = points - ?, version = version + 1"
+                " WHERE user_id = ? AND points >= ?",
+                (cost, user_id, cost),
+            ).rowcount
+            if not paid:
+                return False
+            found = conn.execute(
+                "UPDATE campaigns SET points = points + ?, community_vouches = community_vouches + 1,"
+                " version = version + 1 WHERE id = ?",
+                (cost, campaign_id),
+            ).rowcount
+            if not found:
+                raise KeyError(f"Campaign {campaign_id} does not exist")
+            self._touch(conn, campaign_id)
+            self._record(conn, idempotency_key, "vouch", user_id, campaign_id, cost,
+                         [(wallet_account(user_id), POINTS, -cost), (campaign_account(campaign_id), POINTS, cost)])
+            self._emit(conn, "vouch", user=user_id, campaign=campaign_id, amount=cost)
+        return True
+
+    @traced("db.change_pool")
+    def change_pool(self, user_id, delta, idempotency_key=None):
+        """Add (delta > 0) or withdraw (delta < 0) liquidity. False if the pool is too small.
+
+        ValueError (before any write) if delta is 0.
+        """
+        if not delta:
+            raise ValueError("Pool change must not be zero")
+        self.get_wallet(user_id)
+        with self._transaction() as conn:
+            if self._already_applied(conn, idempotency_key):
+                return True
+            changed = conn.execute(
+                "UPDATE wallets SET investor_pool = investor_pool + ?, version = version + 1"
+                " WHERE user_id = ? AND investor_pool + ? >= 0",
+                (delta, user_id, delta),
+            ).rowcount
+            if not changed:
+                return False
+            self._record(conn, idempotency_key, "deposit" if delta >= 0 else "withdraw", user_id, None, abs(delta),
+                         [(EXTERNAL, USD, -delta), (wallet_account(user_id), USD, delta)])
+            self._emit(conn, "deposit" if delta >= 0 else "withdraw", user=user_id, amount=abs(delta))
+        return True
+
+    @traced("db.invest")
+    def invest(self, user_id, campaign_id, amount, idempotency_key=None):
+        """Fund a campaign from the user's pool.
+
+        False if the pool is too small or another investor funded the campaign first;
+        ValueError unless amount is positive and the campaign has INVESTOR_MIN_POINTS.
+        """
+        _positive(amount, "Investment amount")
+        self.get_wallet(user_id)
+        with self._transaction() as conn:
+            if self._already_applied(conn, idempotency_key):
+                return True
+            # Claim the campaign first: only one investor can flip it to funded
+            claimed = conn.execute(
+                "UPDATE campaigns SET funded_by_investors = 1, investor_funding = ?, version = version + 1"
+                " WHERE id = ? AND funded_by_investors = 0 AND points >= ?",
+                (amount, campaign_id, INVESTOR_MIN_POINTS),
+            ).rowcount
+            if not claimed:
+                row = conn.execute("SELECT points FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+                if row is None:
+                    raise KeyError(f"Campaign {campaign_id} does not exist")
+                if row["points"] < INVESTOR_MIN_POINTS:
+                    raise ValueError(f"Campaign {campaign_id} hasn't reached {INVESTOR_MIN_POINTS} Trust Points yet")
+                return False
+            self._touch(conn, campaign_id)
+            paid = conn.execute(
+                "UPDATE wallets SET investor_pool = investor_pool - ?, version = version + 1"
+                " WHERE user_id = ? AND investor_pool >= ?",
+                (amount, user_id, amount),
+            ).rowcount
+            if not paid:
+                raise _Rollback()
+            name = conn.execute("SELECT name FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()["name"]
+            # The model's rules guard the row (a whole number of dollars, at least 1); ValueError rolls back
+            inv = Investment(campaign_id=campaign_id, business=name, amount=amount, date=date.today())
+            conn.execute(
+                "INSERT INTO investments (campaign_id, user_id, business, amount, date, status, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (inv.campaign_id, user_id, inv.business, inv.amount, inv.date.isoformat(), inv.status, time.time()),
+            )
+            self._record(conn, idempotency_key, "invest", user_id, campaign_id, amount,
+                         [(wallet_account(user_id), USD, -amount), (campaign_account(campaign_id), USD, amount)])
+            self._emit(conn, "invest", user=user_id, campaign=campaign_id, amount=amount)
+        return bool(paid)
+
+    # --- LIKES ---
+    # Likes move no points or money, so they only exist in the event log
+    def like(self, user_id, campaign_id):
+        """Like a campaign; False if this user already had (nothing is counted twice)."""
+        with self._transaction() as conn:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO likes (user_id, campaign_id, created_at) VALUES (?, ?, ?)",
+                (user_id, campaign_id, time.time()),
+            ).rowcount
+            if added:
+                self._emit(conn, "like", user=user_id, campaign=campaign_id)
+            return bool(added)
+
+    def like_count(self, campaign_id):
+        if self.events is None:
+            return 0
+        self._relay()
+        return self.events.read(lambda views: views.likes.get(campaign_id, 0))
+
+    def like_counts(self, campaign_ids):
+        # A whole page of cards from one relay and one read of the views
+        if self.events is None:
+            return dict.fromkeys(campaign_ids, 0)
+        self._relay()
+        return self.events.read(lambda views: {cid: views.likes.get(cid, 0) for cid in campaign_ids})
+
+    # --- COMMENTS ---
+    @traced("db.add_comment")
+    def add_comment(self, user_id, campaign_id, body):
+        """Store a comment and return it. ValueError (before any write) if it's empty or too long."""
+        comment = Comment(campaign_id=campaign_id, user_id=user_id, body=body, created_at=time.time())
+        with self._transaction() as conn:
+            # The cached count changes in the same transaction as the rows it counts
+            found = conn.execute(
+                "UPDATE campaigns SET comment_count = comment_count + 1, version = version + 1 WHERE id = ?",
+                (campaign_id,),
+            ).rowcount
+            if not found:
+                raise KeyError(f"Campaign {campaign_id} does not exist")
+            comment.id = conn.execute(
+                "INSERT INTO comments (campaign_id, user_id, body, created_at) VALUES (?, ?, ?, ?)",
+                (campaign_id, user_id, comment.body, comment.created_at),
+            ).lastrowid
+            self._touch(conn, campaign_id)
+            self._emit(conn, "comment", user=user_id, campaign=campaign_id)
+        return comment
+
+    def list_comments(self, campaign_id, before_id=None, limit=5):
+        """Newest first; pass the last id you got as before_id for the next (older) page."""
+        rows = self._conn().execute(
+            "SELECT id, campaign_id, user_id, body, created_at FROM comments"
+            " WHERE campaign_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (campaign_id, before_id or 2**63 - 1, limit),
+        )
+        return [Comment.from_row(row) for row in rows]
+
+    def events_since(self, position):
+        """Yield (event, position to pass next time) for each event logged after `position`.
+
+        Nothing without a log.
+        """
+        if self.events is None:
+            return iter(())
+        self._relay()
+        return self.events.tail(position)
+
+    def list_investments(self, user_id):
+        rows = self._conn().execute(
+            "SELECT id, campaign_id, business, amount, date, status FROM investments WHERE user_id = ? ORDER BY id",
+            (user_id,),
+        )
+        return [Investment.from_row(row) for row in rows]
+
+    def investments_since(self, user_id, after_id):
+        rows = self._conn().execute(
+            "SELECT id, campaign_id, business, amount, date, status FROM investments"
+            " WHERE user_id = ? AND id > ? ORDER BY id",
+            (user_id, after_id),
+        )
+        return [Investment.from_row(row) for row in rows]
+
+    # --- AUDIT ---
+    def audit(self):
+        """Check the books: every asset nets to zero and every cached balance or count matches its rows."""
+        conn = self._conn()
+        unbalanced = conn.execute(
+            "SELECT asset, SUM(amount) FROM entries GROUP BY asset HAVING SUM(amount) != 0"
+        ).fetchall()
+        ledger = {
+            (row["account"], row["asset"]): row["total"]
+            for row in conn.execute("SELECT account, asset, SUM(amount) AS total FROM entries GROUP BY account, asset")
+        }
+        mismatched = []
+        for row in conn.execute("SELECT user_id, points, investor_pool FROM wallets"):
+            account = wallet_account(row["user_id"])
+            if ledger.get((account, POINTS), 0) != row["points"] or ledger.get((account, USD), 0) != row["investor_pool"]:
+                mismatched.append(account)
+        for row in conn.execute("SELECT id, points FROM campaigns"):
+            account = campaign_account(row["id"])
+            if ledger.get((account, POINTS), 0) != row["points"]:
+                mismatched.append(account)
+        miscounted = [row[0] for row in conn.execute(
+            "SELECT id FROM campaigns WHERE comment_count !="
+            " (SELECT COUNT(*) FROM comments WHERE comments.campaign_id = campaigns.id)"
+        )]
+        report = {"unbalanced_assets": [tuple(row) for row in unbalanced], "mismatched_accounts": mismatched,
+                  "comment_count_mismatches": miscounted}
+        if self.events is not None:
+            report["event_log_mismatches"] = self._audit_events(conn)
+        return report
+
+    def _audit_events(self, conn):
+        # The views folded from the log must agree with the tables
+        self._relay()
+        views = self.events.views()
+        mismatched = []
+        for row in conn.execute("SELECT user_id, points, investor_pool FROM wallets"):
+            if (views.points.get(row["user_id"]), views.investor_pool.get(row["user_id"])) != (row["points"], row["investor_pool"]):
+                mismatched.append(wallet_account(row["user_id"]))
+        for row in conn.execute("SELECT id, points, community_vouches FROM campaigns"):
+            if (views.campaign_points.get(row["id"]), views.community_vouches.get(row["id"])) != (row["points"], row["community_vouches"]):
+                mismatched.append(campaign_account(row["id"]))
+        return mismatched
+
+
+class _Rollback(Exception):
+    """Raised inside a transaction to undo it without reporting an error."""
+
+
+class _Transaction:
+    # BEGIN IMMEDIATE takes the write lock up front, so two processes can't
+    # both read a balance and then both spend it.
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+            return False
+        self.conn.execute("ROLLBACK")
+        return exc_type is _Rollback
+
+
+def open_repository(path=DB_PATH):
+    return SQLiteRepository(path, events=EventLog())
@@ -0,0 +1,16 @@
+import importlib
+
+# Page name (st.session_state.page) -> module in this package. A page's module,
+# and whatever heavy libraries it needs, is only imported the first time
+# someone opens that page; after that it's a dict lookup in sys.modules.
+PAGES = {
+    "Home": "home",
+    "AI Assistant": "ai_assistant",
+    "Fundraising": "fundraising",
+    "Investor Portal": "investor_portal",
+    "Adaptive Tracker": "tracker",
+}
+
+
+def render(page, repo, wallet):
+    importlib.import_module(f"{__name__}.{PAGES[page]}").render(repo, wallet)
@@ -0,0 +1,208 @@
+import streamlit as st
+
+# All Gemini traffic goes through one pooled, retrying client
+from gemini_client import GeminiError
+from roadmap_parser import PhaseStreamParser, continuation_prompt
+# Compact prompts with shared system instructions, paid for out of token budgets
+from prompt_builder import build, quick_wins_prompt, roadmap_prompt
+# Past roadmaps, so a near-identical request is answered without a Gemini call
+from plan_index import PlanIndex
+from views.common import attach_job, get_job_queue, show_job_text, submit_prompt
+
+# How many times we ask Gemini to finish a cut-off roadmap before giving up
+MAX_ROADMAP_CONTINUATIONS = 2
+
+
+@st.cache_resource
+def get_plan_index():
+    # One in-memory copy of the stored plans per process, topped up as the files grow
+    return PlanIndex()
+
+
+def start_roadmap(business_desc, goal_text, duration, budget_monthly):
+    # Check Global Key
+    if "api_key" not in st.session_state or not st.session_state.api_key:
+        st.error("Please enter your API Key in the sidebar first!")
+        return
+    prompt = roadmap_prompt(business_desc, goal_text, duration, budget_monthly)
+
+    # Use Global Key
+    key_to_use = st.session_state.api_key
+    st.session_state["roadmap_job"] = submit_prompt(prompt, key_to_use, "roadmap")
+    st.session_state["roadmap_request"] = {
+        "key": key_to_use,
+        "weeks": duration,
+        "context": f"Business={business_desc}, Goal={goal_text}, Budget=${budget_monthly}",
+        "plan": (business_desc, goal_text, duration, budget_monthly),
+    }
+
+
+# --- HELPER FUNCTION: LIVE ROADMAP PREVIEW ---
+def show_phase_preview(box, phase):
+    box.markdown(f"**📌 {phase['phase']}**")
+    box.markdown("\n".join(f"- {task}" for task in phase["tasks"]))
+
+
+# ==========================================
+# PAGE: AI ASSISTANT (Fixed)
+# ==========================================
+def render(repo, wallet):
+    st.header("🤖 Constraint-Aware AI Assistant")
+    st.caption("Your Virtual Business Manager")
+
+    # WE REMOVED THE EXTRA INPUT HERE because it's now in the global sidebar
+
+    tab_quick, tab_monthly = st.tabs(["⚡ Quick Micro-Actions", "📅 Monthly Strategic Plan"])
+
+    # --- TAB 1: QUICK ACTIONS ---
+    with tab_quick:
+        st.markdown("#### Instant Productivity")
+        st.write("Got 15 minutes? Let's fill it with high-impact work.")
+
+        with st.container(border=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                energy_level = st.select_slider("🔋 Your Current Energy Level", options=["Low (Tired)", "Medium", "High (Let's go!)"])
+                time_now = st.selectbox("⏳ Time You Have RIGHT NOW", ["10 Minutes", "30 Minutes", "1 Hour"])
+            with col2:
+                platform = st.multiselect("📱 Platforms You Use", ["Instagram", "WhatsApp", "Email", "TikTok", "LinkedIn"], default=["Instagram"])
+                task_type = st.selectbox("🎯 Focus Area", ["Sales/Revenue", "Brand Awareness", "Admin/Cleanup"])
+
+            if st.button("⚡ Generate Quick Wins", type="primary"):
+                # Check if the Global Key is missing
+                if "api_key" not in st.session_state or not st.session_state.api_key:
+                    st.error("Please enter your API Key in the sidebar first!")
+                else:
+                    # Use the Global Key
+                    key_to_use = st.session_state.api_key
+
+                    prompt = quick_wins_prompt(energy_level, time_now, task_type, platform)
+
+                    # Micro-actions go to the lightweight tier
+                    st.session_state["quick_wins_job"] = submit_prompt(prompt, key_to_use, "micro")
+
+            # Runs in the background: leaving the page and coming back re-attaches to the same job
+            job = attach_job("quick_wins_job")
+            if job:
+                st.success("🚀 Ready to execute:")
+                show_job_text(job)
+
+    # --- TAB 2: MONTHLY STRATEGY ---
+    with tab_monthly:
+        st.markdown("#### Strategic Growth Engine")
+
+        with st.container(border=True):
+            c1, c2 = st.columns(2)
+            with c1:
+                goal_text = st.text_input("🏆 Main Goal", placeholder="e.g. Launch Summer Collection")
+                business_desc = st.text_input("🛒 What do you sell?", "Handmade Jewelry")
+            with c2:
+                duration = st.slider("🗓️ Duration (Weeks)", 4, 12, 4)
+                budget_monthly = st.number_input("💰 Total Budget ($)", 0, 10000, 500)
+
+            if st.button("📅 Draft Interactive Roadmap"):
+                # Planned something this close before? Offer it instantly and skip the model
+                suggestions = get_plan_index().nearest(business_desc, goal_text, duration, budget_monthly)
+                st.session_state["roadmap_suggestions"] = suggestions
+                if not suggestions:
+                    start_roadmap(business_desc, goal_text, duration, budget_monthly)
+
+            suggestions = st.session_state.get("roadmap_suggestions")
+            if suggestions:
+                st.info("💡 We've drafted very similar plans before. Use one right away, or generate a fresh one.")
+                for n, plan in enumerate(suggestions):
+                    with st.container(border=True):
+                        st.markdown(f"**{plan['business']}** · {plan['goal'] or 'no goal given'} · "
+                                    f"${plan['budget']:,.0f} budget · {plan['score']:.0%} match")
+                        st.caption(" → ".join(phase["phase"] for phase in plan["phases"]))
+                        if st.button("✅ Use this plan", key=f"use_plan_{n}"):
+                            st.session_state["generated_roadmap"] = plan["phases"]
+                            st.session_state.pop("roadmap_partial", None)
+                            st.session_state.pop("roadmap_suggestions", None)
+                            st.rerun()
+                if st.button("✨ Generate a fresh plan instead"):
+                    st.session_state.pop("roadmap_suggestions", None)
+                    start_roadmap(business_desc, goal_text, duration, budget_monthly)
+
+            # Generation runs in the background, so this re-attaches after a rerun or a page change
+            job = attach_job("roadmap_job")
+            if job:
+                request = st.session_state["roadmap_request"]
+                # Stream the answer and show each week as soon as its JSON object closes
+                status = st.status("🤖 AI is designing your tracker...", expanded=True)
+                parser = PhaseStreamParser()
+                weeks = request["weeks"]
+                ready = False
+                roadmap_data, more = None, None
+                try:
+                    for chunk in job.follow():
+                        for phase in parser.feed(chunk):
+                            show_phase_preview(status, phase)
+                    roadmap_data = parser.phases
+
+                    # Cut off early? Keep the finished weeks and only ask for the rest
+                    attempts = 0
+                    while roadmap_data and len(roadmap_data) < weeks and attempts < MAX_ROADMAP_CONTINUATIONS:
+                        attempts += 1
+                        status.update(label=f"🤖 Finishing weeks {len(roadmap_data) + 1}-{weeks}...")
+                        more = PhaseStreamParser()
+                        follow_up = submit_prompt(build("roadmap", continuation_prompt(request["context"], roadmap_data, weeks)), request["key"], "roadmap")
+                        for chunk in get_job_queue().get(follow_up).follow():
+                            for phase in more.feed(chunk):
+                                show_phase_preview(status, phase)
+                        if not more.phases:
+                            break
+                        roadmap_data, more = roadmap_data + more.phases, None
+
+                    if not roadmap_data:
+                        status.update(label="Roadmap failed", state="error")
+                        st.error("AI generated text instead of data. Please try again.")
+                        st.write(parser.buffer) # Debugging
+                    else:
+                        # Save Plan
+                        status.update(label="✅ Roadmap ready!", state="complete")
+                        st.session_state["generated_roadmap"] = roadmap_data[:weeks]
+                        # Next time someone asks for nearly the same plan, it's already here
+                        if len(roadmap_data) >= weeks:
+                            get_plan_index().record(*request["plan"], roadmap_data[:weeks])
+                            st.session_state.pop("roadmap_partial", None)
+                        else:
+                            st.session_state["roadmap_partial"] = f"Only {len(roadmap_data)} of {weeks} weeks could be generated."
+                        ready = True
+
+                except GeminiError as e:
+                    # Cut off mid-stream or on a follow-up call: keep every week already parsed
+                    salvaged = (roadmap_data or parser.phases) + (more.phases if more else [])
+                    if salvaged:
+                        status.update(label="⚠️ Partial roadmap", state="error")
+                        st.session_state["generated_roadmap"] = salvaged[:weeks]
+                        st.session_state["roadmap_partial"] = f"Only {len(salvaged[:weeks])} of {weeks} weeks arrived ({e})."
+                        ready = True
+                    else:
+                        status.update(label="Roadmap failed", state="error")
+                        st.error(f"⚠️ {e}")
+
+                # Finished either way: don't attach to this job again
+                st.session_state.pop("roadmap_job", None)
+                st.session_state.pop("roadmap_request", None)
+                if ready:
+                    st.rerun()
+
+        # Display Plan
+        if "generated_roadmap" in st.session_state:
+            st.divider()
+            st.subheader(f"🚀 Your {duration}-Week Action Plan")
+            st.caption("This is your custom-built tracker. Check off items as you go!")
+            if "roadmap_partial" in st.session_state:
+                st.warning(f"Partial plan: {st.session_state['roadmap_partial']} Draft it again for the remaining weeks.")
+
+            for p, phase in enumerate(st.session_state["generated_roadmap"]):
+                with st.expander(f"📌 {phase['phase']}", expanded=True):
+                    for t, task in enumerate(phase['tasks']):
+                        # Position-based keys: salvaged/continued weeks may repeat a task name
+                        st.checkbox(task, key=f"roadmap_task_{p}_{t}")
+
+            if st.button("🗑️ Clear Plan"):
+                del st.session_state["generated_roadmap"]
+                st.session_state.pop("roadmap_partial", None)
+                st.rerun()
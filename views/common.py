@@ -0,0 +1,105 @@
+import os
+import uuid
+
+import streamlit as st
+
+# Heavy modules (pandas, numpy, requests via the Gemini client) are imported
+# by the pages that use them, so a session that only sees Home never loads them
+import instrumentation
+# Campaigns, points and investments live in a shared database, not the session
+from storage import open_repository
+from search_index import CampaignIndex
+
+# The signed-in owner (wallet id in the shared database)
+CURRENT_USER = "sarah"
+
+# Sort menu -> (index field, descending); None keeps the plain feed order
+SORT_MODES = {
+    "Newest last": None,
+    "🔥 Trending": ("trending", True),
+    "📈 Most active": ("momentum", True),
+    "Closest to goal": ("closest", False),
+    "Most Trust Points": ("points", True),
+    "Most vouches": ("community_vouches", True),
+    "Highest revenue": ("monthly_revenue", True),
+    "Longest in business": ("months_in_business", True),
+}
+
+# Colours and fonts live in .streamlit/config.toml; these are the rules a theme can't express.
+# Read once per process -- a rerun only re-sends the (unchanged) <style> element.
+with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "groflow.css"),
+          encoding="utf-8") as _css:
+    STYLESHEET = f"<style>{_css.read()}</style>"
+
+
+@st.cache_resource
+def get_repo():
+    # One repository per process; every session reads and writes the same database
+    return open_repository()
+
+
+@st.cache_resource
+def get_campaign_index():
+    # Built once per process, then kept current incrementally by sync()
+    return CampaignIndex()
+
+
+def campaign_index(repo):
+    # The shared index, caught up with any campaign changes since the last rerun
+    index = get_campaign_index()
+    with instrumentation.span("index.sync"):
+        index.sync(repo)
+    return index
+
+
+def action_key(name):
+    # One idempotency key per button until its action goes through, so a
+    # double click or a replayed rerun can't charge the same action twice
+    slot = f"idem_{name}"
+    if slot not in st.session_state:
+        st.session_state[slot] = uuid.uuid4().hex
+    return st.session_state[slot]
+
+
+def action_done(name):
+    st.session_state.pop(f"idem_{name}", None)
+
+
+@st.cache_resource
+def get_job_queue():
+    # One worker pool per process, shared by every session
+    from job_queue import JobQueue
+    return JobQueue()
+
+
+def budget_session():
+    # Whose token allowance pays for this session's Gemini calls
+    if "budget_session" not in st.session_state:
+        st.session_state["budget_session"] = uuid.uuid4().hex
+    return st.session_state["budget_session"]
+
+
+def submit_prompt(prompt, key, task):
+    # Queue a prompt_builder Prompt on behalf of this session; returns the job id
+    return get_job_queue().submit(prompt.text, key, task, system=prompt.system, budget_session=budget_session())
+
+
+def attach_job(slot):
+    # The job this session started under `slot`, if the queue still has it
+    job_id = st.session_state.get(slot)
+    job = get_job_queue().get(job_id) if job_id else None
+    if job_id and job is None:
+        st.session_state.pop(slot, None)
+    return job
+
+
+def show_job_text(job):
+    # A finished job is shown at once; a running one streams in as it arrives
+    from gemini_client import GeminiError
+    try:
+        if job.finished:
+            st.markdown(job.wait())
+        else:
+            st.write_stream(job.follow())
+    except GeminiError as e:
+        st.error(f"⚠️ {e}")
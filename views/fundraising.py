@@ -0,0 +1,258 @@
+import streamlit as st
+
+import instrumentation
+# Thumbnails by content hash, stored on disk and shared by every page/session
+import image_service
+from models import COMMENT_MAX_CHARS
+from views.common import CURRENT_USER, SORT_MODES, action_done, action_key, campaign_index, get_repo
+
+FEED_PAGE_SIZE = 12  # cards per marketplace page (multiple of 3 for the grid)
+COMMENTS_PAGE_SIZE = 5  # comments per "older comments" click
+
+
+# --- HELPER FUNCTION: MARKETPLACE CARD ---
+def refresh_card(campaign_id):
+    # After an action only that card reruns, with the arguments the page gave it;
+    # this hands it the row and like count as they are now
+    repo = get_repo()
+    st.session_state[f"card_{campaign_id}"] = (campaign_index(repo).get(campaign_id), repo.like_count(campaign_id))
+
+
+def vouch_for(campaign_id):
+    # Cost to you, gain for them (+1 community vouch) in one transaction
+    action = f"vouch_{campaign_id}"
+    ok = get_repo().vouch(CURRENT_USER, campaign_id, 10, idempotency_key=action_key(action))
+    if ok:
+        action_done(action)
+    # Callbacks can't draw; the card shows the outcome when it redraws
+    st.session_state[f"vouch_result_{campaign_id}"] = ok
+    refresh_card(campaign_id)
+
+
+def like(campaign_id):
+    # One like per user: a repeat click changes nothing; the card redraws with the count
+    st.session_state[f"liked_{campaign_id}"] = get_repo().like(CURRENT_USER, campaign_id)
+    refresh_card(campaign_id)
+
+
+# --- HELPER FUNCTIONS: COMMENTS ---
+# A card's comments are only queried once its toggle is on; the loaded pages
+# live in the session until it's switched off again.
+def load_comments(campaign_id, before_id=None):
+    # Keyset page on (campaign_id, id): as cheap for page 500 as for page 1
+    page = get_repo().list_comments(campaign_id, before_id=before_id, limit=COMMENTS_PAGE_SIZE + 1)
+    return page[:COMMENTS_PAGE_SIZE], len(page) > COMMENTS_PAGE_SIZE
+
+
+def toggle_comments(campaign_id):
+    # Closing forgets what was loaded; opening again starts from the newest
+    if not st.session_state[f"comments_open_{campaign_id}"]:
+        st.session_state.pop(f"comments_{campaign_id}", None)
+
+
+def older_comments(campaign_id):
+    thread = st.session_state[f"comments_{campaign_id}"]
+    page, thread["more"] = load_comments(campaign_id, before_id=thread["comments"][-1].id)
+    thread["comments"].extend(page)
+
+
+def post_comment(campaign_id):
+    slot = f"com_{campaign_id}"
+    try:
+        comment = get_repo().add_comment(CURRENT_USER, campaign_id, st.session_state.get(slot, ""))
+    except ValueError as e:
+        st.session_state[f"comment_error_{campaign_id}"] = str(e)
+        return
+    st.session_state[slot] = ""
+    thread = st.session_state.get(f"comments_{campaign_id}")
+    if thread is not None:
+        thread["comments"].insert(0, comment)
+    refresh_card(campaign_id)
+
+
+def show_comments(campaign_id):
+    thread = st.session_state.get(f"comments_{campaign_id}")
+    if thread is None:
+        comments, more = load_comments(campaign_id)
+        thread = st.session_state[f"comments_{campaign_id}"] = {"comments": comments, "more": more}
+
+    st.text_input("Add a comment...", key=f"com_{campaign_id}", max_chars=COMMENT_MAX_CHARS)
+    st.button("Post", key=f"post_comment_{campaign_id}", on_click=post_comment, args=(campaign_id,))
+    error = st.session_state.pop(f"comment_error_{campaign_id}", None)
+    if error:
+        st.error(error)
+
+    if not thread["comments"]:
+        st.caption("No comments yet. Be the first!")
+    for comment in thread["comments"]:
+        # Plain text: a comment is whatever someone typed, never markdown or HTML
+        st.text(f"{comment.body} - @{comment.user_id}")
+    if thread["more"]:
+        st.button("Older comments", key=f"older_comments_{campaign_id}", on_click=older_comments, args=(campaign_id,))
+
+
+# Each card is a fragment: a vouch or like reruns only that card, not the whole grid.
+# The page syncs the index and counts the likes once for every card it draws.
+@st.fragment
+def campaign_card(campaign_id, camp, likes):
+    repo = get_repo()
+    camp, likes = st.session_state.get(f"card_{campaign_id}", (camp, likes))
+    with instrumentation.span("card", campaign_id=campaign_id), st.container(border=True):
+        # IMAGE
+        image = image_service.card_image(camp.image)
+        if image:
+            st.image(image, use_container_width=True)
+
+        # DETAILS
+        st.subheader(camp.name)
+        st.caption(f"by {camp.owner}")
+        st.write(camp.desc)
+
+        # PROGRESS BAR
+        st.progress(camp.progress)
+        st.caption(f"🏆 {camp.points} / {camp.goal} Trust Points · ❤️ {likes}"
+                   f" · 💬 {camp.comment_count}")
+
+        # Show if investor-funded
+        if camp.funded_by_investors:
+            st.success(f"💼 Investor Funded: ${camp.investor_funding}")
+
+        # INTERACTION BUTTONS
+        b1, b2 = st.columns(2)
+
+        with b1:
+            st.button(f"❤️ Like", key=f"like_{campaign_id}", on_click=like, args=(campaign_id,))
+            liked = st.session_state.pop(f"liked_{campaign_id}", None)
+            if liked is not None:
+                st.toast("You liked this project!" if liked else "You already liked this project.")
+
+        with b2:
+            # Logic: Vouching costs YOU points, gives THEM points
+            if camp.points >= camp.goal:
+                st.success("Funded! 🎉")
+            else:
+                # The vouch runs in the click callback, before the card redraws,
+                # so the card shows the new total without a second rerun
+                st.button(f"✨ Vouch (10)", key=f"vouch_{campaign_id}", on_click=vouch_for, args=(campaign_id,))
+                vouched = st.session_state.pop(f"vouch_result_{campaign_id}", None)
+                if vouched:
+                    st.toast(f"Vouched! You have {repo.get_wallet(CURRENT_USER)['points']} points left.")
+                elif vouched is False:
+                    st.error("Not enough points!")
+
+        # COMMENTS SECTION: a toggle rather than an expander, whose body would
+        # run (and query) on every rerun even while it's closed
+        if st.toggle("💬 Comments", key=f"comments_open_{campaign_id}", on_change=toggle_comments, args=(campaign_id,)):
+            show_comments(campaign_id)
+
+
+# ==========================================
+# PAGE: FUNDRAISING (Pinterest/Instagram Style)
+# ==========================================
+def render(repo, wallet):
+
+    # --- 1. HEADER & WALLET ---
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.header("💰 Community Marketplace")
+        st.caption("Discover businesses, Vouch for quality, and help them unlock capital.")
+    with col2:
+        # High-visibility Wallet
+        st.metric("Your Trust Points", wallet["points"], delta="Available to spend")
+
+    st.divider()
+
+    # --- 2. UPLOAD SECTION (The "Create" Button) ---
+    with st.expander("➕ Create a New Campaign"):
+        with st.form("new_campaign"):
+            c1, c2 = st.columns([1, 2])
+            with c1:
+                # Simulating an image upload (we'll just use a placeholder if they don't have one)
+                uploaded_file = st.file_uploader("Product Image", type=["jpg", "png"])
+            with c2:
+                new_title = st.text_input("Campaign Title")
+                new_desc = st.text_area("Description")
+                new_goal = st.number_input("Goal (Points)", value=1000)
+
+            if st.form_submit_button("Post Campaign"):
+                try:
+                    repo.create_campaign(
+                        name=new_title,
+                        owner="You",
+                        desc=new_desc,
+                        goal=new_goal,
+                        # If no image uploaded, use a random one
+                        image="https://picsum.photos/400/300?random=99" if not uploaded_file else image_service.ingest(uploaded_file.getvalue()),
+                    )
+                except ValueError as e:
+                    # Checked by the Campaign model before anything is stored
+                    st.error(f"⚠️ {e}")
+                else:
+                    st.success("Campaign Posted!")
+                    st.rerun()
+
+    # --- 3. THE FEED (Pinterest Grid) ---
+
+    # SEARCH & SORT
+    s1, s2, s3 = st.columns([2, 1, 1])
+    search_text = s1.text_input("🔎 Search businesses", placeholder="e.g. spices, toys, Sarah")
+    sort_mode = s2.selectbox("Sort by", list(SORT_MODES))
+    min_points = s3.number_input("Min Trust Points", min_value=0, value=0, step=100)
+
+    # Start again from page 1 whenever the search changes
+    feed_query = (search_text, sort_mode, min_points)
+    if st.session_state.get("feed_query") != feed_query:
+        st.session_state.feed_query = feed_query
+        st.session_state.feed_cursors = [None]
+    after = st.session_state.feed_cursors[-1]
+    # One sync per page run; every card below reads from it
+    index = campaign_index(repo)
+
+    if not search_text.strip() and SORT_MODES[sort_mode] is None and not min_points:
+        # Cursor pagination: we remember the last id of every page we've walked
+        # through, so "Next" is an indexed range query instead of loading everything
+        page = [camp.id for camp in repo.list_campaigns_page(after_id=after, limit=FEED_PAGE_SIZE + 1)]
+        has_more = len(page) > FEED_PAGE_SIZE
+        page = page[:FEED_PAGE_SIZE]
+        next_cursor = page[-1] if page else None
+    else:
+        # Searching / sorting goes through the in-memory index; the cursor is an offset
+        sort_field, descending = SORT_MODES[sort_mode] or (None, False)
+        offset = after or 0
+        page = index.query(
+            search_text,
+            filters={"points": (min_points, None)} if min_points else None,
+            sort=sort_field,
+            descending=descending,
+            limit=FEED_PAGE_SIZE + 1,
+            offset=offset,
+        )
+        has_more = len(page) > FEED_PAGE_SIZE
+        page = page[:FEED_PAGE_SIZE]
+        next_cursor = offset + FEED_PAGE_SIZE
+        if not page:
+            st.info("No businesses match your search.")
+
+    # Grid Layout (3 Columns)
+    cols = st.columns(3)
+    likes = repo.like_counts(page)
+
+    for i, camp_id in enumerate(page):
+        # A full run draws from fresh data, so the cards drop what their last action left
+        st.session_state.pop(f"card_{camp_id}", None)
+        # We cycle through columns 0, 1, 2
+        with cols[i % 3]:
+            campaign_card(camp_id, index.get(camp_id), likes[camp_id])
+
+    # PAGER
+    p1, p2, p3 = st.columns([1, 2, 1])
+    with p1:
+        if len(st.session_state.feed_cursors) > 1 and st.button("⬅️ Previous"):
+            st.session_state.feed_cursors.pop()
+            st.rerun()
+    with p2:
+        st.caption(f"Page {len(st.session_state.feed_cursors)}")
+    with p3:
+        if has_more and st.button("Next ➡️"):
+            st.session_state.feed_cursors.append(next_cursor)
+            st.rerun()
@@ -0,0 +1,52 @@
+import streamlit as st
+
+
+# ==========================================
+# PAGE: HOME DASHBOARD
+# ==========================================
+def render(repo, wallet):
+    # Hero Section
+    col1, col2 = st.columns([1.5, 1])
+    with col1:
+        st.title("🌱 GroFlow")
+        st.subheader("Growth. Funding. Freedom.")
+        st.markdown("""
+        **Welcome to your Command Center.**
+        Select a module below to start automating your business.
+        """)
+    with col2:
+        st.image("smallbusiness.jpg", use_container_width=True)
+
+    st.write("---")
+    st.subheader("Select a Module")
+
+    # THE NEW NAVIGATION (Clickable Cards)
+    c1, c2, c3, c4 = st.columns(4)
+
+    with c1:
+        st.info("🤖 **AI Manager**")
+        st.caption("Generate instant marketing tasks.")
+        if st.button("Launch AI Assistant →"):
+            st.session_state.page = "AI Assistant"
+            st.rerun()
+
+    with c2:
+        st.warning("💰 **Fundraising**")
+        st.caption("Unlock capital with Trust Points.")
+        if st.button("Go to Marketplace →"):
+            st.session_state.page = "Fundraising"
+            st.rerun()
+
+    with c3:
+        st.success("📈 **Adaptive Tracker**")
+        st.caption("Recalibrate your monthly goals.")
+        if st.button("Open Tracker →"):
+            st.session_state.page = "Adaptive Tracker"
+            st.rerun()
+
+    with c4:
+        st.error("🏦 **Investor Portal**")
+        st.caption("Fund businesses & earn returns.")
+        if st.button("Access Investor Hub →"):
+            st.session_state.page = "Investor Portal"
+            st.rerun()
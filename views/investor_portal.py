@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Thumbnails by content hash, stored on disk and shared by every page/session
+import image_service
+from portfolio import MONTHLY_RATE, TERM_MONTHS, PortfolioStore
+from risk_sim import simulate_investment, simulate_portfolio
+from storage import INVESTOR_MIN_POINTS
+from views.common import CURRENT_USER, SORT_MODES, action_done, action_key, campaign_index
+
+INVESTOR_SORT_MODES = {name: mode for name, mode in SORT_MODES.items() if name != "Closest to goal"}
+PORTFOLIO_TABLE_ROWS = 500  # latest positions shown in the portfolio table
+OPPORTUNITIES_PAGE_SIZE = 10  # investment-ready cards per page (each runs a risk simulation)
+ASSUMPTION_NOTE = (f"Not measured: every position is assumed to repay in equal monthly payments over "
+                   f"{TERM_MONTHS} months at {MONTHLY_RATE:.0%}/month, so this reflects that assumed rate.")
+
+
+@st.cache_data(max_entries=2000, show_spinner=False)
+def investment_risk(amount, monthly_revenue, months_in_business, community_vouches):
+    # Same inputs -> same (seeded) answer, so every session shares one result
+    return simulate_investment(amount, monthly_revenue, months_in_business, community_vouches)
+
+
+@st.cache_resource
+def get_portfolio(user_id):
+    # One columnar store per investor per process, synced incrementally
+    return PortfolioStore()
+
+
+# ==========================================
+# PAGE: INVESTOR PORTAL (NEW!)
+# ==========================================
+def render(repo, wallet):
+
+    # --- HEADER ---
+    st.header("🏦 Investor Dashboard")
+    st.caption("Deploy capital to vetted small businesses and earn returns while building community impact.")
+
+    st.divider()
+
+    # --- PORTFOLIO OVERVIEW ---
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("💰 Liquidity Pool", f"${wallet['investor_pool']:,.0f}", delta="Available")
+
+    # Columnar portfolio: only investments made since the last rerun are loaded
+    portfolio = get_portfolio(CURRENT_USER)
+    portfolio.sync(repo, CURRENT_USER)
+    with col2:
+        st.metric("📊 Total Deployed", f"${portfolio.total:,.0f}")
+
+    with col3:
+        st.metric("🎯 Active Investments", len(portfolio))
+
+    with col4:
+        # Next month's scheduled repayments across every position (no repayments are recorded yet,
+        # so this and the rates below come from the assumed schedule, not from what was paid back)
+        portfolio_irr = portfolio.irr()
+        st.metric(
+            "💵 Expected Monthly Returns",
+            f"${portfolio.expected_monthly_income():,.0f}",
+            delta=f"{portfolio_irr:.0%} assumed IRR" if portfolio_irr is not None else None,
+            delta_color="off",
+            help=ASSUMPTION_NOTE,
+        )
+
+    st.divider()
+
+    # --- LIQUIDITY POOL MANAGEMENT ---
+    with st.expander("💳 Manage Liquidity Pool"):
+        st.subheader("Add or Withdraw Capital")
+
+        col_add, col_withdraw = st.columns(2)
+
+        with col_add:
+            st.markdown("#### Add Funds")
+            add_amount = st.number_input("Amount to Add ($)", min_value=100, value=1000, step=100, key="add_funds")
+            if st.button("➕ Add to Pool"):
+                repo.change_pool(CURRENT_USER, add_amount, idempotency_key=action_key("add_funds"))
+                action_done("add_funds")
+                st.success(f"Added ${add_amount:,.0f} to your liquidity pool!")
+                st.rerun()
+
+        with col_withdraw:
+            st.markdown("#### Withdraw Funds")
+            withdraw_amount = st.number_input("Amount to Withdraw ($)", min_value=100, value=500, step=100, key="withdraw_funds")
+            if st.button("➖ Withdraw from Pool"):
+                if repo.change_pool(CURRENT_USER, -withdraw_amount, idempotency_key=action_key("withdraw_funds")):
+                    action_done("withdraw_funds")
+                    st.success(f"Withdrew ${withdraw_amount:,.0f} from your pool!")
+                    st.rerun()
+                else:
+                    st.error("Insufficient funds in liquidity pool!")
+
+    st.divider()
+
+    # --- INVESTMENT OPPORTUNITIES ---
+    st.subheader("🔍 Investment-Ready Businesses")
+    st.caption(f"Businesses that have reached {INVESTOR_MIN_POINTS}+ Trust Points and meet funding criteria")
+
+    # Filter campaigns that are eligible for investor funding
+    # (must have reached trust point goal -- sorted index, no full scan)
+    f1, f2 = st.columns([2, 1])
+    investor_search = f1.text_input("🔎 Search investment-ready businesses")
+    investor_sort = f2.selectbox("Sort by", list(INVESTOR_SORT_MODES), key="investor_sort")
+    sort_field, descending = INVESTOR_SORT_MODES[investor_sort] or (None, False)
+
+    # Start again from the first page whenever the search changes
+    investor_query = (investor_search, investor_sort)
+    if st.session_state.get("investor_query") != investor_query:
+        st.session_state.investor_query = investor_query
+        st.session_state.investor_offset = 0
+    offset = st.session_state.investor_offset
+
+    index = campaign_index(repo)
+    eligible_businesses = [
+        index.get(camp_id)
+        for camp_id in index.query(
+            investor_search,
+            filters={"points": (INVESTOR_MIN_POINTS, None)},
+            sort=sort_field,
+            descending=descending,
+            limit=OPPORTUNITIES_PAGE_SIZE + 1,
+            offset=offset,
+        )
+    ]
+    has_more = len(eligible_businesses) > OPPORTUNITIES_PAGE_SIZE
+    eligible_businesses = eligible_businesses[:OPPORTUNITIES_PAGE_SIZE]
+    if not eligible_businesses:
+        st.info(f"No businesses have reached the {INVESTOR_MIN_POINTS} Trust Point threshold yet.")
+    else:
+        # Display as cards
+        for business in eligible_businesses:
+            with st.container(border=True):
+                col_left, col_right = st.columns([2, 1])
+
+                with col_left:
+                    # Business Details
+                    st.subheader(f"🌟 {business.name}")
+                    st.caption(f"Owner: {business.owner}")
+                    st.write(business.desc)
+
+                    # Key Metrics
+                    met1, met2, met3 = st.columns(3)
+                    met1.metric("Trust Points", business.points)
+                    met2.metric("Community Vouches", business.community_vouches)
+                    met3.metric("Monthly Revenue", f"${business.monthly_revenue:,.0f}")
+
+                    # Additional Info
+                    st.caption(f"⏰ In Business: {business.months_in_business} months")
+
+                    # Funding Status
+                    if business.funded_by_investors:
+                        st.success(f"✅ Already Funded: ${business.investor_funding:,.0f}")
+                    else:
+                        st.info("⏳ Awaiting investor funding")
+
+                with col_right:
+                    # Investment Image
+                    image = image_service.card_image(business.image)
+                    if image:
+                        st.image(image, use_container_width=True)
+
+                    # Investment Action
+                    if not business.funded_by_investors:
+                        st.markdown("#### Fund This Business")
+
+                        # Investment amount slider
+                        invest_amount = st.number_input(
+                            "Investment Amount ($)",
+                            min_value=500,
+                            max_value=10000,
+                            value=2000,
+                            step=500,
+                            key=f"invest_amount_{business.id}"
+                        )
+
+                        # Risk calculator: Monte Carlo over revenue / default paths
+                        risk = investment_risk(
+                            invest_amount,
+                            business.monthly_revenue,
+                            business.months_in_business,
+                            business.community_vouches,
+                        )
+                        bands = risk["percentiles"]
+                        st.caption(
+                            f"🎲 Median profit: ${bands['p50']:,.0f} "
+                            f"(5–95%: ${bands['p5']:,.0f} to ${bands['p95']:,.0f}) · "
+                            f"Default risk: {risk['default_probability']:.0%}"
+                        )
+
+                        # Investment button
+                        if st.button(f"💼 Invest ${invest_amount:,.0f}", key=f"invest_btn_{business.id}", type="primary"):
+                            # Deduct from pool, mark business as funded and record it -- all or nothing
+                            action = f"invest_{business.id}"
+                            if repo.invest(CURRENT_USER, business.id, invest_amount, idempotency_key=action_key(action)):
+                                action_done(action)
+                                st.success(f"🎉 Successfully invested ${invest_amount:,.0f} in {business.name}!")
+                                st.balloons()
+                                st.rerun()
+                            else:
+                                st.error("Insufficient liquidity (or another investor got there first)! Add more funds to your pool.")
+                    else:
+                        st.success("✅ Funded")
+                        st.caption("This business has received funding")
+
+        # PAGER
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if offset and st.button("⬅️ Previous", key="investor_prev"):
+                st.session_state.investor_offset = max(offset - OPPORTUNITIES_PAGE_SIZE, 0)
+                st.rerun()
+        with p2:
+            st.caption(f"Page {offset // OPPORTUNITIES_PAGE_SIZE + 1}")
+        with p3:
+            if has_more and st.button("Next ➡️", key="investor_next"):
+                st.session_state.investor_offset = offset + OPPORTUNITIES_PAGE_SIZE
+                st.rerun()
+
+    st.divider()
+
+    # --- MY INVESTMENTS ---
+    st.subheader("📋 My Investment Portfolio")
+
+    if not len(portfolio):
+        st.info("You haven't made any investments yet. Browse opportunities above!")
+    else:
+        # Create DataFrame (latest positions only -- the store itself can hold 100k+)
+        inv_df = pd.DataFrame(portfolio.positions(limit=PORTFOLIO_TABLE_ROWS))
+
+        # Display as table
+        st.dataframe(
+            inv_df,
+            use_container_width=True,
+            column_config={
+                "business": "Business Name",
+                "amount": st.column_config.NumberColumn("Investment", format="$%d"),
+                "date": st.column_config.DateColumn("Investment Date"),
+                "status": "Status"
+            }
+        )
+
+        # Summary metrics
+        concentration = portfolio.concentration()
+        twr = portfolio.time_weighted_return()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Invested", f"${portfolio.total:,.0f}")
+        with col2:
+            st.metric("Assumed IRR (annual)", f"{portfolio_irr:.1%}" if portfolio_irr is not None else "n/a",
+                      help=ASSUMPTION_NOTE)
+        with col3:
+            st.metric("Scheduled Time-Weighted Return", f"{twr:.1%}" if twr is not None else "n/a",
+                      help=ASSUMPTION_NOTE)
+        with col4:
+            st.metric(
+                "Largest Position",
+                f"{concentration['top_share']:.0%}",
+                delta=f"HHI {concentration['hhi']:.2f}",
+                delta_color="off",
+            )
+
+        # Risk simulation for the whole book
+        with st.expander("🎲 Portfolio Risk Simulation"):
+            st.caption("Thousands of simulated revenue paths per business; a business defaults when revenue can't cover its repayment.")
+            if st.button("Run simulation"):
+                with st.spinner("Simulating..."):
+                    # Look up each business's stats once, then spread them over the positions
+                    n = len(portfolio)
+                    unique_ids, position_of = np.unique(portfolio.campaign_ids[:n], return_inverse=True)
+                    stats = [index.get(int(cid)) for cid in unique_ids]
+                    def stat(field):
+                        return np.array([getattr(s, field) for s in stats], dtype=np.float64)[position_of]
+                    result = simulate_portfolio(
+                        portfolio.amounts[:n],
+                        portfolio.rates[:n],
+                        stat("monthly_revenue"),
+                        stat("months_in_business"),
+                        stat("community_vouches"),
+                    )
+                bands = result["percentiles"]
+                r1, r2, r3, r4 = st.columns(4)
+                r1.metric("Bad case (5%)", f"${bands['p5']:,.0f}")
+                r2.metric("Median profit", f"${bands['p50']:,.0f}")
+                r3.metric("Good case (95%)", f"${bands['p95']:,.0f}")
+                r4.metric("Default rate", f"{result['default_probability']:.0%}",
+                          delta=f"{result['loss_probability']:.0%} chance of a loss", delta_color="off")
+
+        # Cash-flow schedule (money in vs. scheduled repayments per month)
+        months, contributions, distributions, balances = portfolio.schedule()
+        st.caption(f"📅 Cash-flow schedule ({TERM_MONTHS}-month repayment at {MONTHLY_RATE:.0%}/month)")
+        st.bar_chart(
+            pd.DataFrame(
+                {"Invested": -contributions, "Repaid": distributions},
+                index=months.astype("datetime64[M]").astype(str),
+            ),
+            color=["#8B4513", "#6B8E23"],
+        )
@@ -0,0 +1,198 @@
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from revenue_store import RevenueStore, downsample, forecast_month, to_day
+from recalibration import MILESTONES, CONCURRENCY, BatchRun, build_prompt, execution_score, read_cohort
+from views.common import attach_job, show_job_text, submit_prompt
+
+TRACKER_BUSINESS = "Sarah's Cakes"  # whose revenue the Adaptive Tracker follows
+MAX_BATCH_RUNS = 20  # cohort runs kept per process (finished ones are dropped oldest first)
+
+
+@st.cache_resource
+def get_revenue_store():
+    # Daily revenue files are shared by every session; reads are cached per file
+    return RevenueStore()
+
+
+@st.cache_resource
+def get_batch_runs():
+    # Cohort runs outlive the script run that started them; sessions keep only the run id
+    return OrderedDict()
+
+
+def start_batch_run(rows, api_key, concurrency):
+    runs = get_batch_runs()
+    finished = [run_id for run_id, run in runs.items() if run.finished]
+    for run_id in finished[:max(len(finished) - MAX_BATCH_RUNS + 1, 0)]:
+        del runs[run_id]
+    run_id = uuid.uuid4().hex
+    runs[run_id] = BatchRun(rows, api_key, concurrency=concurrency)
+    return run_id
+
+
+def show_batch_run(run):
+    st.progress(run.done / run.total if run.total else 1.0,
+                text=f"{run.done} / {run.total} businesses ({run.failed} failed)")
+    if run.latest:
+        st.caption(f"Latest: {run.latest['business']} — {run.latest['status']}")
+    if run.error:
+        st.error(f"⚠️ Batch stopped early: {run.error}")
+    # The report holds every finished row, so it downloads mid-run too
+    st.download_button(
+        "⬇️ Download Recovery Plans (CSV)" if run.finished else "⬇️ Download Plans So Far (CSV)",
+        run.report(),
+        file_name="recovery_plans.csv",
+        mime="text/csv",
+    )
+
+
+@st.fragment(run_every=1.0)
+def follow_batch_run(run):
+    # Redraws only this section each second; one full rerun once the last row is in
+    show_batch_run(run)
+    if run.finished:
+        st.rerun()
+
+
+# ==========================================
+# PAGE: ADAPTIVE TRACKER (With AI & Checklists)
+# ==========================================
+def render(repo, wallet):
+    st.header("📈 Closed-Loop Adaptive Tracker")
+    st.caption("Real-time accountability: If you miss targets, the AI recalibrates your roadmap.")
+
+    # API Key is needed here for the "Recalibrate" feature
+    api_key = st.sidebar.text_input("Enter Gemini API Key", type="password")
+
+    revenue_store = get_revenue_store()
+
+    # --- 1. PERFORMANCE INPUTS ---
+    with st.container(border=True):
+        st.subheader("📊 Live Performance Data")
+        with st.expander("🧾 Record revenue"):
+            r1, r2, r3 = st.columns([2, 2, 1])
+            sale_day = r1.date_input("Day", key="revenue_day")
+            sale_amount = r2.number_input("Revenue ($)", min_value=0.0, step=10.0, key="revenue_amount")
+            if r3.button("Save", key="revenue_save"):
+                revenue_store.record(TRACKER_BUSINESS, sale_day, sale_amount)
+                st.toast(f"Saved ${sale_amount:,.2f} for {sale_day}")
+            upload = st.file_uploader("Bulk import (CSV: date,revenue)", type=["csv"], key="revenue_csv")
+            if upload is not None and st.button("Import CSV", key="revenue_import"):
+                added = revenue_store.import_csv(TRACKER_BUSINESS, upload.getvalue().decode("utf-8", "replace"))
+                st.toast(f"Imported {added} days of revenue")
+
+        col1, col2, col3 = st.columns(3)
+        target = col1.number_input("Monthly Revenue Goal ($)", value=1000)
+        forecast = forecast_month(revenue_store, TRACKER_BUSINESS, target)
+        if forecast:
+            # Real numbers from the recorded history
+            current = round(forecast["month_to_date"], 2)
+            days = max(forecast["days_left"], 1)
+            col2.metric("Revenue This Month", f"${current:,.2f}")
+            col3.metric("Days Remaining in Month", forecast["days_left"])
+        else:
+            current = col2.number_input("Current Revenue Achieved ($)", value=400)
+            days = col3.slider("Days Remaining in Month", 1, 30, 10)
+
+    # --- 2. WEEKLY CHECKLIST (New Feature) ---
+    st.write("---")
+    st.subheader("✅ Weekly Milestones Checklist")
+    st.caption("Tick the tasks you actually completed this week. The AI analyzes your misses.")
+
+    # Organized columns for checkboxes
+    completed = [col.checkbox(label) for col, (_, label, _) in zip(st.columns(len(MILESTONES)), MILESTONES)]
+
+    # Calculate "Execution Score" based on ticks
+    score = execution_score(completed)
+
+    # Show a progress bar for the checklist
+    st.progress(score / 100)
+    st.caption(f"Execution Score: {score}%")
+
+    # --- 3. VISUALS & LOGIC ---
+    st.write("---")
+    gap = target - current
+
+    # Burn-Down Chart (Graph)
+    st.subheader("📉 Burn-Down Chart")
+    if forecast:
+        # Month so far vs. the straight-line pace to the goal, plus the projection
+        today = to_day(np.datetime64("today", "D"))
+        month_start = int(np.datetime64("today", "M").astype("datetime64[D]").astype(np.int64))
+        actual = np.cumsum(revenue_store.daily(TRACKER_BUSINESS, month_start, today))
+        projected = actual[-1] + np.cumsum(forecast["forecast"])
+        month_days = np.arange(month_start, forecast["forecast_days"][-1] + 1 if len(projected) else today + 1)
+        chart_data = pd.DataFrame({
+            "Actual": np.concatenate((actual, np.full(len(projected), np.nan))),
+            "Forecast": np.concatenate((np.full(len(actual) - 1, np.nan), actual[-1:], projected)),
+            "Goal pace": target * (month_days - month_start + 1) / len(month_days),
+        }, index=month_days.astype("datetime64[D]"))
+        st.line_chart(chart_data, color=["#6B8E23", "#FFA500", "#999999"])
+        if forecast["projected_gap"] > 0:
+            st.warning(f"At the current trend you'll finish around ${forecast['projected_total']:,.0f}, "
+                       f"${forecast['projected_gap']:,.0f} short of the goal.")
+        else:
+            st.success(f"At the current trend you'll finish around ${forecast['projected_total']:,.0f}.")
+
+        # Full daily history, averaged down to what the chart can actually draw
+        history_days, history = revenue_store.load(TRACKER_BUSINESS)
+        span = np.arange(min(history_days[0], today), today + 1)
+        daily = revenue_store.daily(TRACKER_BUSINESS, span[0], span[-1])
+        span, daily = downsample(span, daily)
+        with st.expander("Daily revenue history"):
+            st.line_chart(pd.DataFrame({"Revenue": daily}, index=span.astype("datetime64[D]")), color="#6B8E23")
+    else:
+        st.info("No revenue recorded yet. Save a day or import a CSV above to see your real trend and forecast.")
+
+    # --- 4. AI RECALIBRATION LOGIC ---
+    if gap > 0:
+        # Standard Math Calculation
+        daily_needed = (forecast and forecast["required_run_rate"]) or gap / days
+        st.error(f"⚠️ You are behind by ${gap:,.2f}. To catch up, you need ${daily_needed:.2f}/day.")
+
+        # The AI Recalibration Button
+        if st.button("🔄 AI Recalibrate Strategy", type="primary"):
+            if not api_key:
+                st.error("Please enter your API Key in the sidebar to recalibrate!")
+            else:
+                # Same Crisis Management Coach prompt the batch mode uses
+                prompt = build_prompt(target, current, days, completed)
+                st.session_state["recalibrate_job"] = submit_prompt(prompt, api_key, "coach")
+
+        # Stream the plan so the first lines show up right away (re-attaches after a page change)
+        job = attach_job("recalibrate_job")
+        if job:
+            st.divider()
+            st.subheader("🚀 Your AI Recovery Plan")
+            show_job_text(job)
+
+    else:
+        st.success("🎉 You are on track! Keep up the momentum.")
+        st.balloons()
+
+    # --- 5. BATCH RECALIBRATE (whole cohort) ---
+    st.write("---")
+    st.subheader("👥 Batch Recalibrate")
+    st.caption("Upload a cohort CSV: business, target, current, days_left and a 1/0 column per milestone ("
+               + ", ".join(column for column, _, _ in MILESTONES) + ").")
+    cohort_file = st.file_uploader("Cohort CSV", type=["csv"], key="cohort_csv")
+    concurrency = st.slider("Parallel requests", 1, 32, CONCURRENCY, key="cohort_concurrency")
+    if cohort_file is not None and st.button("🚀 Recalibrate Cohort", key="cohort_run"):
+        if not api_key:
+            st.error("Please enter your API Key in the sidebar to recalibrate!")
+        else:
+            cohort = read_cohort(cohort_file.getvalue().decode("utf-8", "replace"))
+            # Plans arrive in completion order on a background thread; the report grows as they do
+            st.session_state["cohort_batch"] = start_batch_run(cohort, api_key, concurrency)
+
+    run = get_batch_runs().get(st.session_state.get("cohort_batch"))
+    if run is not None:
+        if run.finished:
+            show_batch_run(run)
+        else:
+            follow_batch_run(run)